@@ -7,3 +7,5 @@ admin.site.register(Movies)
 admin.site.register(Reviews)
 admin.site.register(User)
 admin.site.register(Watchlist)
+admin.site.register(OutboxEmail)
+admin.site.register(EmailOTP)
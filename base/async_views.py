@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.db.models import F, Q
+from django.http import Http404, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.pagination import _positive_int
+from .authentication import CachedTokenAuthentication
+from .models import Movies, Reviews
+from .pagination import MovieCursorPagination, ReviewCursorPagination, WatchlistCursorPagination
+from .serializers import MovieSerializer, ReviewSerializer
+
+# Async twins of the hot read endpoints, served under /async/ when the
+# project runs behind IMDB/asgi.py. They read through Django's async ORM and
+# page with a (date, id) keyset cursor, so a waiting request holds no
+# worker thread. The serializers only see prefetched rows and never query.
+
+
+def encode_cursor(date, pk):
+    return base64.urlsafe_b64encode(json.dumps([date.isoformat(), pk]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    date, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(date), int(pk)
+
+
+async def keyset_page(request, queryset, date_field, id_field, pagination):
+    try:
+        # As DRF does: a missing, zero, negative or non-numeric size gets the default
+        size = _positive_int(request.GET['page_size'], strict=True, cutoff=pagination.max_page_size)
+    except (KeyError, ValueError):
+        size = pagination.page_size
+    try:
+        cursor = request.GET.get('cursor')
+        if cursor:
+            date, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(**{f'{date_field}__lt': date}) | Q(**{date_field: date, f'{id_field}__lt': pk}))
+    except (TypeError, ValueError):
+        return None, None
+    queryset = queryset.order_by(f'-{date_field}', f'-{id_field}')[:size + 1]
+    items = [item async for item in queryset]
+    next_url = None
+    if len(items) > size:
+        items = items[:size]
+        last = items[-1]
+        query = request.GET.copy()
+        query['cursor'] = encode_cursor(getattr(last, date_field), getattr(last, id_field))
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+    return items, next_url
+
+
+async def authenticated_user(request):
+    # The sync views' token authentication, so its caches and revocation
+    # apply here too, at the cost of one hop to the sync thread
+    header = request.headers.get('Authorization', '').split()
+    if len(header) != 2 or header[0].lower() != 'token':
+        return None
+    try:
+        user, token = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(header[1])
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+def movie_queryset():
+    return Movies.objects.select_related('platform').prefetch_related('genre')
+
+
+def invalid_cursor():
+    return JsonResponse({'detail': 'Invalid cursor'}, status=404)
+
+
+async def movie_list(request):
+    movies = movie_queryset()
+    if 'platform' in request.GET:
+        try:
+            platform = int(request.GET['platform'])
+        except ValueError:
+            # The same error the sync view's filter backend gives
+            return JsonResponse({'platform': ['Select a valid choice. That choice is not one of the available choices.']}, status=400)
+        movies = movies.filter(platform=platform)
+    if 'active' in request.GET:
+        movies = movies.filter(active=request.GET['active'].lower() in ('true', '1'))
+    page, next_url = await keyset_page(request, movies, 'added_date', 'id', MovieCursorPagination)
+    if page is None:
+        return invalid_cursor()
+    return JsonResponse({'next': next_url, 'results': MovieSerializer(page, many=True).data})
+
+
+async def movie_detail(request, pk):
+    try:
+        movie = await movie_queryset().aget(pk=pk)
+    except Movies.DoesNotExist:
+        raise Http404
+    return JsonResponse(MovieSerializer(movie).data)
+
+
+async def movie_reviews(request, pk):
+    reviews = Reviews.objects.filter(movie_id=pk).select_related('movie')
+    page, next_url = await keyset_page(request, reviews, 'added_date', 'id', ReviewCursorPagination)
+    if page is None:
+        return invalid_cursor()
+    return JsonResponse({'next': next_url, 'results': ReviewSerializer(page, many=True).data})
+
+
+async def view_watchlist(request):
+    user = await authenticated_user(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    movies = movie_queryset().filter(watchlist__user=user).annotate(
+        watchlist_added_on=F('watchlist__added_on'), watchlist_id=F('watchlist__id'),
+    )
+    page, next_url = await keyset_page(request, movies, 'watchlist_added_on', 'watchlist_id', WatchlistCursorPagination)
+    if page is None:
+        return invalid_cursor()
+    return JsonResponse({'next': next_url, 'results': MovieSerializer(page, many=True).data})
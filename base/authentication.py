@@ -0,0 +1,157 @@
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Enable with
+#     REST_FRAMEWORK = {'DEFAULT_AUTHENTICATION_CLASSES': ['base.authentication.CachedTokenAuthentication']}
+#
+# Two tiers sit in front of the `authtoken_token JOIN user` lookup:
+#   * an optional shared Django cache (TOKEN_AUTH_CACHE_ALIAS, TOKEN_AUTH_CACHE_TTL), and
+#   * a bounded LRU with a TTL inside each process (TOKEN_AUTH_LOCAL_MAXSIZE,
+#     TOKEN_AUTH_LOCAL_TTL), off by default.
+# Logout, token deletion and user saves invalidate both tiers of this process
+# and the shared tier at once. Other processes only learn about it through
+# the shared cache: invalidation also stores a new revision for each token
+# there, and a local hit whose revision no longer matches is dropped. So
+# with several processes, enable the local tier only together with a
+# shared cache; without one it is safe for a single process only, as other
+# processes would accept a deleted token for up to TOKEN_AUTH_LOCAL_TTL
+# seconds.
+#
+# Bulk `QuerySet.update()` calls send no signals: after deactivating users
+# that way, call invalidate_user() for each of them.
+
+
+class LRUCache:
+    """Thread-safe LRU mapping whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        with self._lock:
+            for key in [key for key, (_, value) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LRUCache(
+    maxsize=getattr(settings, 'TOKEN_AUTH_LOCAL_MAXSIZE', 10000),
+    ttl=getattr(settings, 'TOKEN_AUTH_LOCAL_TTL', 0),
+)
+
+
+def shared_cache():
+    alias = getattr(settings, 'TOKEN_AUTH_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def shared_key(key):
+    # Never store raw token keys in a shared cache
+    return 'authtoken:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def revision_key(key):
+    return 'authtoken-revision:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def revoke(cache, keys):
+    # Outlives every local entry stored before it, so none of them matches again
+    revision = uuid.uuid4().hex
+    cache.set_many({revision_key(key): revision for key in keys}, local_cache.ttl + 1)
+    cache.delete_many([shared_key(key) for key in keys])
+
+
+def invalidate_token(key):
+    local_cache.delete(key)
+    cache = shared_cache()
+    if cache is not None:
+        revoke(cache, [key])
+
+
+def invalidate_user(user_id):
+    local_cache.delete_where(lambda entry: entry[1].user_id == user_id)
+    cache = shared_cache()
+    if cache is not None:
+        revoke(cache, list(Token.objects.filter(user_id=user_id).values_list('key', flat=True)))
+
+
+def local_token(key, revision):
+    """The locally cached token for `key`, unless revoked since it was stored."""
+    entry = local_cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] != revision:
+        local_cache.delete(key)
+        return None
+    return entry[1]
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def get_token(self, key):
+        cache = shared_cache()
+        # Read before the lookup, so a revocation racing it invalidates what we store
+        revision = cache.get(revision_key(key)) if cache is not None and local_cache.ttl > 0 else None
+        token = local_token(key, revision)
+        if token is not None:
+            return token
+        if cache is not None:
+            token = cache.get(shared_key(key))
+        if token is None:
+            try:
+                token = self.get_model().objects.select_related('user').get(key=key)
+            except self.get_model().DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            if cache is not None:
+                cache.set(shared_key(key), token, getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 300))
+        local_cache.set(key, (revision, token))
+        return token
+
+    def authenticate_credentials(self, key):
+        # Hand each request its own copies so per-request state never leaks
+        # into the cached instances
+        token = copy.copy(self.get_token(key))
+        token.user = copy.copy(token.user)
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return (token.user, token)
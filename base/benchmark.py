@@ -0,0 +1,306 @@
+import datetime
+import logging
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import namedtuple
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from .compression import ENCODERS
+from .models import Movies, MovieGenre, Reviews, User, Watchlist
+from .renderers import MessagePackRenderer, msgpack
+from .synthetic import ADMIN_EMAIL, DOMAIN, PASSWORD, user_email
+
+# Endpoint benchmarks over the data from `manage.py generate_synthetic_data`,
+# run by `manage.py benchmark_endpoints`. Every route in base/urls.py is
+# requested in-process through the full middleware and URL stack and
+# reported as latency percentiles, queries per request and the peak Python
+# memory of one request.
+#
+# Each request runs in a transaction that is rolled back afterwards, so
+# write routes see the same rows on every iteration and runs stay
+# repeatable. on_commit hooks (cache version bumps) therefore never fire,
+# and read routes are measured with a warm response cache unless --cold.
+# Throttles are lifted so the register and login routes measure their own
+# cost.
+
+Route = namedtuple('Route', 'name method args data auth format', defaults=((), None, None, 'json'))
+
+
+def catalog_csv():
+    rows = ''.join(f'Bench Import {i},Imported.,2020,true,https://{DOMAIN}/import/{i},Bench Platform 0,,Bench Genre 0\n' for i in range(50))
+    return SimpleUploadedFile('catalog.csv', ('title,description,release_year,active,link,platform,platform_url,genre\n' + rows).encode())
+
+
+def movie_payload(f):
+    return {
+        'title': 'Bench Posted', 'description': 'Posted.', 'release_year': '2020-01-01', 'genre': [f['genre']],
+        'active': True, 'link': f'https://{DOMAIN}/posted', 'platform': f['platform'],
+    }
+
+
+def review_payload(f):
+    return {'movie': f['movie'], 'email': user_email(0), 'full_name': 'Bench', 'ratings': 8, 'comment': 'Benchmarked.'}
+
+
+ROUTES = [
+    Route('movies', 'get'),
+    Route('movies', 'get', data=lambda f: {'q': 'Crimson Storm'}),
+    Route('movies', 'post', data=movie_payload, auth='admin'),
+    Route('movie_export', 'get', auth='admin'),
+    Route('movie_import', 'post', data=lambda f: {'file': catalog_csv()}, auth='admin', format='multipart'),
+    Route('movies_detail', 'get', args=lambda f: [f['movie']]),
+    Route('movies_detail', 'put', args=lambda f: [f['movie']], data=lambda f: dict(movie_payload(f), link=f'https://{DOMAIN}/movies/put'), auth='admin'),
+    Route('movies_detail', 'patch', args=lambda f: [f['movie']], data=lambda f: {'active': False}, auth='admin'),
+    Route('movies_detail', 'delete', args=lambda f: [f['movie']], auth='admin'),
+    Route('platform', 'get'),
+    Route('platform', 'post', data=lambda f: {'name': 'Bench Posted', 'url': f'https://{DOMAIN}/posted'}, auth='admin'),
+    Route('platform_detail', 'get', args=lambda f: [f['platform']]),
+    Route('platform_detail', 'patch', args=lambda f: [f['platform']], data=lambda f: {'name': 'Bench Renamed'}, auth='admin'),
+    Route('platform_detail', 'delete', args=lambda f: [f['platform']], auth='admin'),
+    Route('platform_movies', 'get', args=lambda f: [f['platform']]),
+    Route('reviews', 'post', data=review_payload, auth='user'),
+    Route('reviews_batch', 'post', data=lambda f: [review_payload(f)] * 50, auth='user'),
+    Route('reviews_detail', 'patch', args=lambda f: [f['review']], data=lambda f: {'ratings': 9}, auth='user'),
+    Route('reviews_detail', 'delete', args=lambda f: [f['review']], auth='user'),
+    Route('movie_review', 'get', args=lambda f: [f['movie']]),
+    Route('movie_review_stats', 'get', args=lambda f: [f['movie']]),
+    Route('review_stats_batch', 'get', data=lambda f: {'ids': ','.join(map(str, f['movies']))}),
+    Route('movie_similar', 'get', args=lambda f: [f['movie']]),
+    Route('leaderboard_top', 'get'),
+    Route('leaderboard_trending', 'get'),
+    Route('movie_genre', 'get'),
+    Route('movie_genre', 'post', data=lambda f: {'name': 'Bench Posted'}, auth='admin'),
+    Route('movie_genre_details', 'get', args=lambda f: [f['genre']]),
+    Route('movie_genre_details', 'patch', args=lambda f: [f['genre']], data=lambda f: {'name': 'Bench Renamed'}, auth='admin'),
+    Route('movie_genre_details', 'delete', args=lambda f: [f['genre']], auth='admin'),
+    Route('register', 'post', data=lambda f: {
+        'email': f'new@{DOMAIN}', 'password': PASSWORD, 'first_name': 'Ne', 'last_name': 'W',
+        'age': 20, 'gender': 'male', 'address': 'Benchmark', 'phone': '9799999999',
+    }),
+    Route('verify', 'post', data=lambda f: {'email': user_email(0), 'otp': '000000'}),
+    Route('verify_resend', 'post', data=lambda f: {'email': user_email(0)}),
+    Route('login', 'post', data=lambda f: {'email': user_email(0), 'password': PASSWORD}),
+    Route('logout', 'post', auth='user'),
+    Route('add_to_watchlist', 'post', args=lambda f: [f['unwatched']], auth='user'),
+    Route('bulk_add_to_watchlist', 'post', data=lambda f: {'movies': f['movies']}, auth='user'),
+    Route('view_watchlist', 'get', auth='user'),
+    Route('delete_watchlist', 'delete', args=lambda f: [f['watched']], auth='user'),
+    Route('bulk_delete_watchlist', 'post', data=lambda f: {'movies': f['watched_many']}, auth='user'),
+    Route('async_movies', 'get'),
+    Route('async_movies_detail', 'get', args=lambda f: [f['movie']]),
+    Route('async_movie_review', 'get', args=lambda f: [f['movie']]),
+    Route('async_view_watchlist', 'get', auth='user'),
+]
+
+
+def route_key(route, data):
+    label = f'{route.method.upper()} {route.name}'
+    if route.method == 'get' and data:
+        label += '?' + '&'.join(sorted(data))
+    return label
+
+
+def unbenchmarked_routes(routes=ROUTES):
+    names = {name for name in get_resolver('base.urls').reverse_dict if isinstance(name, str)}
+    return sorted(names - {route.name for route in routes})
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def load_fixtures():
+    """Ids of the synthetic rows the routes act on; None without synthetic data."""
+    admin = User.objects.filter(email=ADMIN_EMAIL).first()
+    user = User.objects.filter(email=user_email(0)).first()
+    movies = Movies.objects.filter(link__startswith=f'https://{DOMAIN}/').order_by('-review_count', 'pk')
+    movie = movies.first()
+    if admin is None or user is None or movie is None:
+        return None
+    watched = list(Watchlist.objects.filter(user=user).order_by('pk').values_list('movie_id', flat=True)[:20])
+    return {
+        'admin': Token.objects.get_or_create(user=admin)[0].key,
+        'user': Token.objects.get_or_create(user=user)[0].key,
+        'movie': movie.pk,
+        'movies': list(movies.values_list('pk', flat=True)[:20]),
+        'platform': movie.platform_id,
+        'genre': MovieGenre.objects.filter(name__startswith='Bench Genre ').order_by('pk').values_list('pk', flat=True).first(),
+        'review': Reviews.objects.filter(movie=movie).values_list('pk', flat=True).first(),
+        'watched': watched[0] if watched else movie.pk,
+        'watched_many': watched or [movie.pk],
+        'unwatched': movies.exclude(pk__in=watched).values_list('pk', flat=True).first(),
+    }
+
+
+def dataset_size():
+    return {
+        'movies': Movies.objects.count(),
+        'reviews': Reviews.objects.count(),
+        'watchlist': Watchlist.objects.count(),
+        'users': User.objects.count(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class EndpointBenchmark:
+    def __init__(self, requests=30, warmup=3, cold=False, only=None):
+        self.requests = requests
+        self.warmup = warmup
+        self.cold = cold
+        self.only = set(only or ())
+
+    def run(self, fixtures, progress=None):
+        results = {}
+        lifted = {scope: {'ip': (10 ** 9, 10 ** 6), 'email': (10 ** 9, 10 ** 6)} for scope in ('login', 'register', 'verify', 'resend')}
+        # The 4xx routes would log a warning per request
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(THROTTLE_BUCKETS=lifted, ALLOWED_HOSTS=['*']):
+                for route in ROUTES:
+                    if self.only and route.name not in self.only:
+                        continue
+                    key, row = self.measure(route, fixtures)
+                    results[key] = row
+                    if progress is not None:
+                        progress(key, row)
+        finally:
+            request_logger.setLevel(level)
+        return {
+            'meta': {
+                'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'revision': git_revision(),
+                'database': connection.vendor,
+                'dataset': dataset_size(),
+                'requests': self.requests,
+                'warmup': self.warmup,
+                'cold_cache': self.cold,
+            },
+            'routes': results,
+        }
+
+    def request(self, client, route, fixtures):
+        data = route.data(fixtures) if route.data else None
+        if self.cold:
+            cache.clear()
+        with transaction.atomic():
+            started = time.perf_counter()
+            response = getattr(client, route.method)(reverse(route.name, args=route.args(fixtures) if route.args else ()), data, format=route.format)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return response, elapsed
+
+    def measure(self, route, fixtures):
+        client = APIClient()
+        if route.auth:
+            client.credentials(HTTP_AUTHORIZATION=f'Token {fixtures[route.auth]}')
+        key = route_key(route, route.data(fixtures) if route.data else None)
+
+        for _ in range(self.warmup):
+            self.request(client, route, fixtures)
+        latencies, queries, statuses = [], [], set()
+        for _ in range(self.requests):
+            with CaptureQueriesContext(connection) as captured:
+                response, elapsed = self.request(client, route, fixtures)
+            latencies.append(elapsed * 1000)
+            # Minus the SAVEPOINT/ROLLBACK of the benchmark's own transaction
+            queries.append(len([q for q in captured.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'ROLLBACK', 'RELEASE'))]))
+            statuses.add(response.status_code)
+
+        tracemalloc.start()
+        try:
+            self.request(client, route, fixtures)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return key, {
+            'status': sorted(statuses),
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'queries': round(statistics.fmean(queries), 1),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+
+def compare(baseline, current, tolerance=0.25, noise_ms=1.0):
+    """Regressions of `current` against `baseline`, as human-readable lines."""
+    regressions = []
+    for key, row in current['routes'].items():
+        old = baseline['routes'].get(key)
+        if old is None:
+            continue
+        if row['queries'] > old['queries']:
+            regressions.append(f"{key}: queries {old['queries']} -> {row['queries']}")
+        if row['p95_ms'] > old['p95_ms'] * (1 + tolerance) and row['p95_ms'] - old['p95_ms'] > noise_ms:
+            regressions.append(f"{key}: p95 {old['p95_ms']} ms -> {row['p95_ms']} ms")
+        if row['peak_kb'] > old['peak_kb'] * (1 + tolerance) and row['peak_kb'] - old['peak_kb'] > 64:
+            regressions.append(f"{key}: peak memory {old['peak_kb']} KiB -> {row['peak_kb']} KiB")
+    return regressions
+
+
+# Wire formats, for `manage.py benchmark_response_formats`: the response of
+# each list below is rendered with every renderer and then compressed with
+# every encoding CompressionMiddleware offers. Times are process CPU time per
+# response (render, then render plus compression); sizes are the bytes the
+# client receives.
+
+FORMAT_ROUTES = [
+    Route('movies', 'get', data=lambda f: {'page_size': 100}),
+    Route('movie_review', 'get', args=lambda f: [f['movie']], data=lambda f: {'page_size': 100}),
+]
+
+
+def format_renderers():
+    renderers = {'json': JSONRenderer()}
+    if msgpack is not None:
+        renderers['msgpack'] = MessagePackRenderer()
+    return renderers
+
+
+def cpu_ms(func, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return (time.process_time() - started) * 1000 / repeat, result
+
+
+def measure_formats(fixtures, repeat=200, routes=FORMAT_ROUTES):
+    """{route: {format+encoding: {bytes, render_ms, total_ms, vs_json}}}, against plain JSON."""
+    results = {}
+    client = APIClient()
+    for route in routes:
+        data = route.data(fixtures) if route.data else None
+        response = getattr(client, route.method)(reverse(route.name, args=route.args(fixtures) if route.args else ()), data)
+        rows = {}
+        for name, renderer in format_renderers().items():
+            render_ms, body = cpu_ms(lambda: renderer.render(response.data, renderer.media_type, response.renderer_context), repeat)
+            rows[name] = {'bytes': len(body), 'render_ms': round(render_ms, 3), 'total_ms': round(render_ms, 3)}
+            for coding, encode in ENCODERS.items():
+                encode_ms, compressed = cpu_ms(lambda: encode(body), repeat)
+                rows[f'{name}+{coding}'] = {'bytes': len(compressed), 'render_ms': round(render_ms, 3), 'total_ms': round(render_ms + encode_ms, 3)}
+        plain = rows['json']['bytes']
+        for row in rows.values():
+            row['vs_json'] = round(row['bytes'] / plain, 3)
+        results[route_key(route, data)] = rows
+    return results
@@ -0,0 +1,90 @@
+import hashlib
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .routers import may_be_stale
+
+# Versioned response cache for the read endpoints.
+#
+# Every namespace ('movies', 'platform', 'genre') has a version stored in the
+# cache together with the time of the last change. Cached responses are keyed
+# on that version, so a write only has to replace the version (see
+# base/signals.py) and every older entry becomes unreachable. The version
+# also drives ETag and Last-Modified for conditional GETs.
+#
+# Set RESPONSE_CACHE_ALIAS to a cache shared by all workers (Redis,
+# Memcached) in production; with the per-process local-memory cache a write
+# only invalidates the worker that handled it.
+
+
+def response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def version_key(namespace):
+    return f'response-version:{namespace}'
+
+
+def get_version(namespace):
+    cache = response_cache()
+    current = cache.get(version_key(namespace))
+    if current is None:
+        # Cold or evicted: start a fresh version, treating "now" as the last change
+        cache.add(version_key(namespace), (uuid.uuid4().hex, time.time()), None)
+        current = cache.get(version_key(namespace)) or (uuid.uuid4().hex, time.time())
+    return current
+
+
+def bump_versions(*namespaces):
+    def bump():
+        response_cache().set_many({version_key(namespace): (uuid.uuid4().hex, time.time()) for namespace in namespaces}, None)
+    # Only after commit, otherwise a concurrent read could cache the old rows under the new version
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin:
+    """Serve list/retrieve from the versioned cache and answer conditional GETs with 304."""
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        version, modified = get_version(self.cache_namespace)
+        accepted = request.accepted_renderer.media_type if getattr(request, 'accepted_renderer', None) else ''
+        digest = hashlib.sha256(f'{version}|{request.get_full_path()}|{accepted}'.encode()).hexdigest()[:32]
+        etag = quote_etag(digest)
+        headers = {'ETag': etag, 'Last-Modified': http_date(modified)}
+
+        if self.not_modified(request, etag, modified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache = response_cache()
+        key = f'response:{self.cache_namespace}:{digest}'
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, headers=headers)
+        response = handler(request, *args, **kwargs)
+        # A replica that has not caught up with the last write would pin old rows to the new version
+        if response.status_code == status.HTTP_200_OK and not may_be_stale(modified):
+            cache.set(key, response.data, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+    def not_modified(self, request, etag, modified):
+        # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2) and
+        # compares weakly: compression turns the ETag into W/"..."
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return if_none_match.strip() == '*' or etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return if_modified_since is not None and int(modified) <= if_modified_since
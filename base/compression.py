@@ -0,0 +1,106 @@
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response compression negotiated from Accept-Encoding. Add
+# 'base.compression.CompressionMiddleware' near the top of MIDDLEWARE, below
+# SecurityMiddleware and above anything that reads or sets the body.
+#
+# Brotli is preferred when the brotli package is installed and the client
+# accepts both at the same q-value, then gzip. Bodies shorter than
+# RESPONSE_COMPRESSION_MIN_BYTES (default 1024) are sent as they are: below
+# about one packet the saving does not pay for the CPU. Levels are tuned
+# for per-request work, not for the best ratio. Streaming responses (the
+# catalog export) compress themselves and are left alone.
+#
+# A strong ETag is weakened on compressed responses, as Django's
+# GZipMiddleware does, and the response cache compares validators weakly,
+# so conditional GETs still get their 304. Tokens travel in the
+# Authorization header, never in a cookie, so a cross-site page cannot make
+# a browser send authenticated requests to probe compressed sizes (BREACH).
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def compress_gzip(body):
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_brotli(body):
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+# In order of preference
+ENCODERS = {'br': compress_brotli, 'gzip': compress_gzip} if brotli is not None else {'gzip': compress_gzip}
+
+
+def min_bytes():
+    return getattr(settings, 'RESPONSE_COMPRESSION_MIN_BYTES', 1024)
+
+
+def accepted_codings(header):
+    """Content codings of an Accept-Encoding header, mapped to their q-value."""
+    codings = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+
+def negotiate(header, offered=None):
+    """The encoding to use for a request's Accept-Encoding header, or None.
+
+    `offered` lists the codings the caller can produce, in order of
+    preference; by default every one in ENCODERS.
+    """
+    codings = accepted_codings(header or '')
+    best, best_q = None, 0.0
+    for coding in offered or ENCODERS:
+        q = codings.get(coding, codings.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        # The body may be compressed for some clients, so caches must key on the header
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < min_bytes():
+            return response
+        coding = negotiate(request.headers.get('Accept-Encoding'))
+        if coding is None:
+            return response
+
+        compressed = ENCODERS[coding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = coding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -1,32 +1,52 @@
-from django.core.mail import send_mail
-import random
 from django.conf import settings
-from .models import User
+from .models import OutboxEmail
+from .otp import get_otp_store
+
+def queue_mail(subject, message, from_email, recipient_list):
+    # Delivered later by `manage.py send_queued_mail`; call this inside the
+    # request transaction so the mail is only queued if the write commits.
+    return OutboxEmail.objects.create(subject=subject, message=message, from_email=from_email, recipients=list(recipient_list))
 
 def send_otp_for_verification_email(email):
     subject = 'Your Email Verification Captcha'
-    otp = random.randint(100000, 999999)
+    otp = get_otp_store().issue(email)
     message = f'Your OTP for email verification is {otp}. It is only applicable for 5 minutes. Thank you.'
     from_email = settings.EMAIL_HOST
-    send_mail(subject, message, from_email, [email])
-    user_obj = User.objects.get(email = email)
-    user_obj.otp = otp
-    user_obj.save()
-    
-def send_email_for_review_added(email, title, ratings):
+    queue_mail(subject, message, from_email, [email])
+
+def review_added_email(email, title, ratings):
     subject = 'Thank you for your Review'
     message = f'Your review to the movie {title} is successfully added with the rating {ratings}.'
     from_email = settings.EMAIL_HOST
-    send_mail(subject, message, from_email, [email])
-    
+    return OutboxEmail(subject=subject, message=message, from_email=from_email, recipients=[email])
+
+def send_email_for_review_added(email, title, ratings):
+    review_added_email(email, title, ratings).save()
+
+def send_emails_for_reviews_added(reviews):
+    # One INSERT for the whole batch; each review needs its movie loaded
+    OutboxEmail.objects.bulk_create([review_added_email(review.email, review.movie.title, review.ratings) for review in reviews])
+
 def send_mail_add_to_watchlist(email, title):
     subject = f'{title} Added to Watchlist'
     message = f'Your movie {title} has been added to your watchlist.'
     from_email = settings.EMAIL_HOST
-    send_mail(subject, message, from_email, [email])
-    
+    queue_mail(subject, message, from_email, [email])
+
 def send_mail_delete_watchlist(email, title):
     subject = f'{title} removed from Watchlist'
     message = f'Your movie {title} has been removed from your watchlist.'
     from_email = settings.EMAIL_HOST
-    send_mail(subject, message, from_email, [email])
\ No newline at end of file
+    queue_mail(subject, message, from_email, [email])
+
+def send_mail_watchlist_digest(email, added=(), removed=()):
+    # One mail summarising a bulk watchlist change
+    lines = []
+    if added:
+        lines.append(f"Added to your watchlist: {', '.join(added)}.")
+    if removed:
+        lines.append(f"Removed from your watchlist: {', '.join(removed)}.")
+    subject = 'Your Watchlist has been updated'
+    message = '\n'.join(lines)
+    from_email = settings.EMAIL_HOST
+    queue_mail(subject, message, from_email, [email])
@@ -0,0 +1,48 @@
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Movies
+
+# Streaming NDJSON export of the whole catalog, shared by GET /movies/export/
+# and `manage.py export_catalog`. Movies are read through iterator(), which
+# uses a server-side cursor where the database has one and prefetches genres
+# one chunk at a time, so memory stays flat whatever the catalog size.
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def movie_row(movie):
+    return {
+        'id': movie.id,
+        'title': movie.title,
+        'description': movie.description,
+        'release_year': movie.release_year,
+        'active': movie.active,
+        'link': movie.link,
+        'platform': movie.platform.name,
+        'genre': [genre.name for genre in movie.genre.all()],
+        'rating': movie.rating,
+        'review_count': movie.review_count,
+        'added_date': movie.added_date,
+        'updated_date': movie.updated_date,
+    }
+
+
+def iter_ndjson(chunk_size=2000):
+    movies = Movies.objects.select_related('platform').prefetch_related('genre').order_by('id')
+    lines = []
+    for movie in movies.iterator(chunk_size=chunk_size):
+        lines.append(encoder.encode(movie_row(movie)))
+        if len(lines) >= chunk_size:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        # Sync-flush so each chunk reaches the client as soon as it is read
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,203 @@
+import csv
+import datetime
+import io
+import json
+import time
+from itertools import islice
+from django.db import transaction
+from django.utils import timezone
+from .caching import bump_versions
+from .models import Movies, MovieGenre, Platform
+from .search import index_movies
+
+# Streaming catalog import shared by `manage.py import_catalog` and the
+# admin-only POST /movies/import/ endpoint.
+#
+# Each input row carries: title, description, release_year (YYYY or
+# YYYY-MM-DD), link, platform, platform_url (only needed when the platform
+# is new), genre (a list in JSONL, "|"-separated in CSV) and optionally
+# active. Rows are processed in chunks, one transaction per chunk: platforms
+# and genres are upserted by name, movies are upserted on their unique title
+# with a single INSERT ... ON CONFLICT, and their genre rows are replaced in
+# one bulk insert.
+
+MOVIE_FIELDS = ['description', 'release_year', 'active', 'link', 'platform', 'updated_date']
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        row['genre'] = [name for name in (row.get('genre') or '').split('|') if name.strip()]
+        yield row
+
+
+class InvalidRow:
+    """An input line the reader could not parse, reported as that row's error."""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield InvalidRow(f'Invalid JSON: {e}')
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def text_stream(binary):
+    return io.TextIOWrapper(binary, encoding='utf-8', newline='')
+
+
+def parse_release_year(value):
+    value = str(value).strip()
+    if len(value) == 4:
+        return datetime.date(int(value), 1, 1)
+    return datetime.date.fromisoformat(value)
+
+
+def parse_active(value):
+    if value is None or value == '':
+        return True
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+class CatalogImporter:
+    def __init__(self, chunk_size=5000, max_errors=100):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.platforms = {}
+        self.genres = {}
+        self.stats = {'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+
+    def run(self, rows, progress=None):
+        started = time.monotonic()
+        rows = iter(rows)
+        try:
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                self.import_chunk(chunk)
+                if progress is not None:
+                    progress(self.report(started))
+        finally:
+            # Earlier chunks are committed even if reading a later one fails
+            bump_versions('movies', 'platform', 'genre')
+        return self.report(started)
+
+    def report(self, started):
+        elapsed = time.monotonic() - started
+        return dict(self.stats, seconds=round(elapsed, 3), rows_per_second=round(self.stats['rows'] / elapsed if elapsed else 0, 1))
+
+    def error(self, line, message):
+        self.stats['skipped'] += 1
+        if len(self.stats['errors']) < self.max_errors:
+            self.stats['errors'].append({'row': line, 'error': message})
+
+    def import_chunk(self, chunk):
+        first_line = self.stats['rows'] + 1
+        self.stats['rows'] += len(chunk)
+        parsed = {}
+        for line, row in enumerate(chunk, start=first_line):
+            if isinstance(row, InvalidRow):
+                self.error(line, row.message)
+                continue
+            try:
+                title = row['title'].strip()
+                if title in parsed:
+                    # Keeping one of them keeps created + updated + skipped == rows
+                    self.error(line, f"Title {title!r} repeats row {parsed[title]['line']}.")
+                    continue
+                parsed[title] = {
+                    'line': line,
+                    'title': title,
+                    'description': row.get('description') or '',
+                    'release_year': parse_release_year(row['release_year']),
+                    'active': parse_active(row.get('active')),
+                    'link': row['link'].strip(),
+                    'platform': row['platform'].strip(),
+                    'platform_url': (row.get('platform_url') or '').strip(),
+                    'genre': [name.strip() for name in row.get('genre') or []],
+                }
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                self.error(line, f'{type(e).__name__}: {e}')
+
+        with transaction.atomic():
+            self.upsert_platforms(parsed)
+            self.upsert_genres(parsed)
+            self.upsert_movies(parsed)
+
+    def upsert_platforms(self, parsed):
+        missing = {row['platform']: row['platform_url'] for row in parsed.values() if row['platform'] not in self.platforms}
+        if missing:
+            self.platforms.update(Platform.objects.filter(name__in=missing).values_list('name', 'id'))
+            new = [Platform(name=name, url=url) for name, url in missing.items() if name not in self.platforms and url]
+            if new:
+                Platform.objects.bulk_create(new, ignore_conflicts=True)
+                self.platforms.update(Platform.objects.filter(name__in=[p.name for p in new]).values_list('name', 'id'))
+        for title, row in list(parsed.items()):
+            if row['platform'] not in self.platforms:
+                self.error(row['line'], f"Unknown platform {row['platform']!r} and no platform_url given.")
+                del parsed[title]
+
+    def upsert_genres(self, parsed):
+        missing = {name for row in parsed.values() for name in row['genre'] if name not in self.genres}
+        if missing:
+            self.genres.update(MovieGenre.objects.filter(name__in=missing).values_list('name', 'id'))
+            new = [MovieGenre(name=name) for name in missing if name not in self.genres]
+            if new:
+                MovieGenre.objects.bulk_create(new, ignore_conflicts=True)
+                self.genres.update(MovieGenre.objects.filter(name__in=[g.name for g in new]).values_list('name', 'id'))
+
+    def upsert_movies(self, parsed):
+        # A link already owned by a different title, in the table or earlier
+        # in this chunk, would break the unique constraint
+        owners = dict(Movies.objects.filter(link__in=[row['link'] for row in parsed.values()]).values_list('link', 'title'))
+        claimed = {}
+        for title, row in list(parsed.items()):
+            if owners.get(row['link'], title) != title:
+                self.error(row['line'], f"Link {row['link']!r} already belongs to {owners[row['link']]!r}.")
+                del parsed[title]
+            elif row['link'] in claimed:
+                self.error(row['line'], f"Link {row['link']!r} repeats row {claimed[row['link']]}.")
+                del parsed[title]
+            else:
+                claimed[row['link']] = row['line']
+        if not parsed:
+            return
+
+        existing = set(Movies.objects.filter(title__in=parsed).values_list('title', flat=True))
+        now = timezone.now()
+        Movies.objects.bulk_create(
+            [
+                Movies(
+                    title=row['title'], description=row['description'], release_year=row['release_year'],
+                    active=row['active'], link=row['link'], platform_id=self.platforms[row['platform']],
+                    added_date=now, updated_date=now,
+                )
+                for row in parsed.values()
+            ],
+            update_conflicts=True,
+            unique_fields=['title'],
+            update_fields=MOVIE_FIELDS,
+        )
+        self.stats['updated'] += len(existing)
+        self.stats['created'] += len(parsed) - len(existing)
+
+        ids = dict(Movies.objects.filter(title__in=parsed).values_list('title', 'id'))
+        Through = Movies.genre.through
+        Through.objects.filter(movies_id__in=ids.values()).delete()
+        Through.objects.bulk_create([
+            Through(movies_id=ids[title], moviegenre_id=self.genres[name])
+            for title, row in parsed.items()
+            for name in dict.fromkeys(row['genre'])
+        ])
+        index_movies([(ids[title], title, row['description']) for title, row in parsed.items()])
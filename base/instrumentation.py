@@ -0,0 +1,136 @@
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Per-request cost accounting. Add 'base.instrumentation.RequestMetricsMiddleware'
+# near the top of MIDDLEWARE and every sampled request gets:
+#
+#   Server-Timing: db;dur=4.1;desc="6 queries", serializer;dur=2.3, view;dur=1.0, total;dur=7.4
+#
+# plus one JSON log line on this logger. `db` is time spent in SQL,
+# `serializer` the Python time inside serializer to_representation (SQL it
+# triggers counts under db), and `view` whatever is left. Settings:
+#
+#   REQUEST_METRICS_SAMPLE_RATE  fraction of requests measured (default 1.0)
+#   SLOW_QUERY_MS                log queries at least this slow (default 100)
+#   N_PLUS_ONE_THRESHOLD         log a query shape repeated this often (default 5)
+#
+# Unsampled requests skip everything, so a low sample rate costs next to
+# nothing. Async views run their queries on another thread and report no SQL.
+
+current = ContextVar('request_metrics', default=None)
+
+# "IN (%s, %s, %s)" has the same shape whatever the list length
+IN_LIST = re.compile(r'\((?:%s, )*%s\)')
+
+
+def query_shape(sql):
+    return IN_LIST.sub('(...)', sql)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        self.shapes = Counter()
+        self.slow_ms = getattr(settings, 'SLOW_QUERY_MS', 100)
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.sql_seconds += elapsed
+            self.shapes[query_shape(sql)] += 1
+            if elapsed * 1000 >= self.slow_ms:
+                # The shape only: parameters can hold emails and password hashes
+                logger.warning(json.dumps({'event': 'slow_query', 'ms': round(elapsed * 1000, 2), 'sql': sql}))
+
+    def suspected_n_plus_one(self, threshold=None):
+        threshold = threshold or getattr(settings, 'N_PLUS_ONE_THRESHOLD', 5)
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+@contextmanager
+def collect():
+    """Record the queries and serializer time of the block on every connection."""
+    metrics = RequestMetrics()
+    token = current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            yield metrics
+    finally:
+        current.reset(token)
+
+
+class TimedSerializerMixin:
+    """Count a serializer's to_representation towards the request's serializer time."""
+
+    def to_representation(self, instance):
+        metrics = current.get()
+        if metrics is None or metrics.serializer_depth:
+            return super().to_representation(instance)
+        metrics.serializer_depth += 1
+        started, sql_before = time.perf_counter(), metrics.sql_seconds
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_depth -= 1
+            metrics.serializer_seconds += time.perf_counter() - started - (metrics.sql_seconds - sql_before)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 1.0):
+            return self.get_response(request)
+        started = time.perf_counter()
+        with collect() as metrics:
+            response = self.get_response(request)
+        self.report(request, response, metrics, time.perf_counter() - started)
+        return response
+
+    def report(self, request, response, metrics, total_seconds):
+        db_ms = metrics.sql_seconds * 1000
+        serializer_ms = metrics.serializer_seconds * 1000
+        total_ms = total_seconds * 1000
+        view_ms = max(total_ms - db_ms - serializer_ms, 0)
+        timing = (
+            f'db;dur={db_ms:.1f};desc="{metrics.queries} queries", serializer;dur={serializer_ms:.1f}, '
+            f'view;dur={view_ms:.1f}, total;dur={total_ms:.1f}'
+        )
+        response['Server-Timing'] = f"{response['Server-Timing']}, {timing}" if response.has_header('Server-Timing') else timing
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(db_ms, 2),
+            'serializer_ms': round(serializer_ms, 2),
+            'view_ms': round(view_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }
+        logger.info(json.dumps(record))
+        for shape, count in metrics.suspected_n_plus_one():
+            logger.warning(json.dumps({'event': 'n_plus_one', 'route': record['route'], 'path': request.path, 'count': count, 'sql': shape}))
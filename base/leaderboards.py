@@ -0,0 +1,143 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+from .models import LeaderboardEntry, Movies, Reviews
+
+# Ranked boards served by /leaderboards/:
+#   'top'               every active, reviewed movie scored by Movies.rating
+#   'genre:<id>'        the same, per MovieGenre
+#   'platform:<id>'     the same, per Platform
+#   'trending'          exponentially decayed review volume
+#
+# Trending scores a movie by log2(sum of 2 ** (age_of_review_since_EPOCH /
+# half_life)) over its reviews. All scores share that growth, so comparing
+# them ranks movies by review volume where a review counts half as much
+# every TRENDING_HALF_LIFE_DAYS, and no periodic decay job is needed. The
+# sum itself would overflow a float after about 1024 half-lives, so it is
+# kept in log space: a new review is folded in with log2_add, in SQL, and
+# the stored score only grows by one per half-life.
+
+TOP = 'top'
+TRENDING = 'trending'
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+LN2 = math.log(2)
+
+
+def genre_board(genre_id):
+    return f'genre:{genre_id}'
+
+
+def platform_board(platform_id):
+    return f'platform:{platform_id}'
+
+
+def half_life():
+    return timedelta(days=getattr(settings, 'TRENDING_HALF_LIFE_DAYS', 3))
+
+
+def trending_weight(when):
+    """log2 of the trending weight of a review made at `when`."""
+    return (when - EPOCH) / half_life()
+
+
+def log2_add(a, b):
+    """log2(2 ** a + 2 ** b) without computing either power."""
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def log2_add_expression(field, value):
+    # log2_add(field, value) as an UPDATE expression, with the functions
+    # every backend has (SQLite gets LN and EXP from Django)
+    return Greatest(field, Value(value)) + Ln(1 + Exp(-Abs(field - Value(value)) * LN2)) / LN2
+
+
+def rating_boards(movie, genre_ids):
+    if not movie.active or not movie.review_count:
+        return []
+    return [TOP, platform_board(movie.platform_id)] + [genre_board(pk) for pk in genre_ids]
+
+
+def rating_entries(movies):
+    """LeaderboardEntry rows for movies whose genres are prefetched."""
+    return [
+        LeaderboardEntry(board=board, movie_id=movie.pk, score=movie.rating)
+        for movie in movies
+        for board in rating_boards(movie, [genre.pk for genre in movie.genre.all()])
+    ]
+
+
+def refresh_movies(movie_ids):
+    """Re-score the rating boards of the given movies after a review or catalog write."""
+    movie_ids = list(movie_ids)
+    if not movie_ids:
+        return
+    movies = Movies.objects.filter(pk__in=movie_ids).prefetch_related('genre')
+    entries = rating_entries(movies)
+    # Drop boards a movie left (genre removed, deactivated, last review gone)
+    keep = {(entry.board, entry.movie_id) for entry in entries}
+    current = LeaderboardEntry.objects.filter(movie_id__in=movie_ids).exclude(board=TRENDING).values_list('pk', 'board', 'movie_id')
+    stale = [pk for pk, board, movie_id in current if (board, movie_id) not in keep]
+    if stale:
+        LeaderboardEntry.objects.filter(pk__in=stale).delete()
+    LeaderboardEntry.objects.bulk_create(entries, update_conflicts=True, unique_fields=['board', 'movie'], update_fields=['score'])
+
+
+def bump_trending(counts, when=None):
+    """Add `count` new reviews per movie id to the trending board."""
+    weight = trending_weight(when or timezone.now())
+    for movie_id, count in counts.items():
+        added = weight + math.log2(count)
+        score = log2_add_expression(F('score'), added)
+        if LeaderboardEntry.objects.filter(board=TRENDING, movie_id=movie_id).update(score=score):
+            continue
+        try:
+            with transaction.atomic():
+                LeaderboardEntry.objects.create(board=TRENDING, movie_id=movie_id, score=added)
+        except IntegrityError:
+            # A concurrent review created the row first
+            LeaderboardEntry.objects.filter(board=TRENDING, movie_id=movie_id).update(score=score)
+
+
+def drop_board(board):
+    LeaderboardEntry.objects.filter(board=board).delete()
+
+
+def read_board(board, limit):
+    return (
+        LeaderboardEntry.objects.filter(board=board)
+        .order_by('-score', 'movie_id')
+        .select_related('movie__platform')
+        .prefetch_related('movie__genre')[:limit]
+    )
+
+
+def rebuild(chunk_size=2000):
+    """Recompute every board from Movies and Reviews; returns the number of rows written."""
+    written = 0
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        movies = Movies.objects.filter(active=True, review_count__gt=0).prefetch_related('genre').order_by('pk')
+        batch = []
+        for movie in movies.iterator(chunk_size=chunk_size):
+            batch.append(movie)
+            if len(batch) == chunk_size:
+                written += len(LeaderboardEntry.objects.bulk_create(rating_entries(batch)))
+                batch = []
+        written += len(LeaderboardEntry.objects.bulk_create(rating_entries(batch)))
+
+        # Reviews older than 20 half-lives add less than a millionth of a new one
+        since = timezone.now() - 20 * half_life()
+        scores = {}
+        for movie_id, added in Reviews.objects.filter(added_date__gte=since).values_list('movie_id', 'added_date').iterator(chunk_size=chunk_size):
+            weight = trending_weight(added)
+            scores[movie_id] = log2_add(scores[movie_id], weight) if movie_id in scores else weight
+        written += len(LeaderboardEntry.objects.bulk_create(
+            [LeaderboardEntry(board=TRENDING, movie_id=movie_id, score=score) for movie_id, score in scores.items()],
+            batch_size=chunk_size,
+        ))
+    return written
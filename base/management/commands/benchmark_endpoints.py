@@ -0,0 +1,45 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from base.benchmark import EndpointBenchmark, compare, load_fixtures, unbenchmarked_routes
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every base/urls.py route against the synthetic data set and write latency, query and memory figures as JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30, help='Measured requests per route.')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per route first.')
+        parser.add_argument('--route', action='append', dest='routes', help='Only benchmark this URL name; may be repeated.')
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='Baseline JSON file; fail if any route regressed.')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown before a route counts as regressed.')
+
+    def handle(self, *args, **options):
+        fixtures = load_fixtures()
+        if fixtures is None:
+            raise CommandError('No synthetic data found; run `manage.py generate_synthetic_data` first.')
+        for name in unbenchmarked_routes():
+            self.stderr.write(f'No benchmark defined for route {name!r}.')
+
+        def progress(key, row):
+            self.stdout.write(
+                f"{key:45} p50 {row['p50_ms']:8.2f} ms  p95 {row['p95_ms']:8.2f} ms  "
+                f"{row['queries']:6.1f} queries  {row['peak_kb']:9.1f} KiB  {row['status']}"
+            )
+
+        benchmark = EndpointBenchmark(requests=options['requests'], warmup=options['warmup'], cold=options['cold'], only=options['routes'])
+        results = benchmark.run(fixtures, progress=progress)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                regressions = compare(json.load(f), results, tolerance=options['tolerance'])
+            for line in regressions:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}.')
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(results['routes'])} routes."))
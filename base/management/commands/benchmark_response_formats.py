@@ -0,0 +1,29 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from base.benchmark import load_fixtures, measure_formats
+
+
+class Command(BaseCommand):
+    help = 'Compare bytes on the wire and render CPU of JSON, MessagePack, gzip and brotli for the movie and review lists.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Renders timed per format.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+
+    def handle(self, *args, **options):
+        fixtures = load_fixtures()
+        if fixtures is None:
+            raise CommandError('No synthetic data found; run `manage.py generate_synthetic_data` first.')
+        results = measure_formats(fixtures, repeat=options['repeat'])
+        for key, rows in results.items():
+            self.stdout.write(key)
+            for name, row in rows.items():
+                self.stdout.write(
+                    f"  {name:14} {row['bytes']:9} bytes  {row['vs_json']:6.3f}x  "
+                    f"render {row['render_ms']:7.3f} ms  with compression {row['total_ms']:7.3f} ms"
+                )
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+        self.stdout.write(self.style.SUCCESS(f'Measured {len(results)} routes.'))
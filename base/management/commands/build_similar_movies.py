@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from base.similarity import build
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the watchlist co-occurrence neighbours behind /movies/<pk>/similar/ (needs numpy and scipy).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every movie instead of only the queued changes.')
+        parser.add_argument('--top-k', type=int, help='Neighbours kept per movie; defaults to SIMILAR_MOVIES_TOP_K.')
+        parser.add_argument('--min-count', type=int, default=1, help='Users a pair must share to be scored.')
+        parser.add_argument('--block-size', type=int, default=2000, help='Movies scored per sparse product.')
+        parser.add_argument('--chunk-size', type=int, default=50000, help='Rows fetched or inserted per query.')
+
+    def handle(self, *args, **options):
+        try:
+            report = build(
+                full=options['full'], k=options['top_k'], min_count=options['min_count'],
+                block_size=options['block_size'], chunk_size=options['chunk_size'],
+            )
+        except ImportError as e:
+            raise CommandError(f'build_similar_movies needs numpy and scipy: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {report['movies']} movies from {report['watchlist_rows']} watchlist rows "
+            f"in {report['seconds']}s, wrote {report['entries']} neighbours."
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from base.query_plans import check_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the main query of each hot endpoint and fail if any of them scans a whole table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just the failing ones.')
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            for label, plan, scans in check_plans():
+                if scans:
+                    failures.append(label)
+                    self.stderr.write(f"{label}: full scan of {', '.join(scans)}\n{plan}")
+                elif options['verbose_plans']:
+                    self.stdout.write(f'{label}:\n{plan}')
+        except NotImplementedError as e:
+            raise CommandError(str(e))
+        if failures:
+            raise CommandError(f"{len(failures)} queries fall back to a full scan: {', '.join(failures)}.")
+        self.stdout.write(self.style.SUCCESS('Every hot query is served from an index.'))
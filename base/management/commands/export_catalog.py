@@ -0,0 +1,25 @@
+import sys
+from django.core.management.base import BaseCommand
+from base.export import gzip_stream, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Stream the whole catalog as NDJSON (one movie per line), optionally gzipped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file, or '-' for stdout.")
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per round trip.')
+
+    def handle(self, *args, **options):
+        chunks = iter_ndjson(chunk_size=options['chunk_size'])
+        if options['gzip']:
+            chunks = gzip_stream(chunks)
+        out = sys.stdout.buffer if options['path'] == '-' else open(options['path'], 'wb')
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
@@ -0,0 +1,36 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from base.importer import READERS, CatalogImporter, text_stream
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV or JSONL catalog file into Movies, upserting platforms, genres and movies in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin.")
+        parser.add_argument('--format', choices=sorted(READERS), help='Input format; defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per transaction.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if fmt not in READERS:
+            raise CommandError(f"Cannot tell the format of {path!r}; pass --format {'/'.join(sorted(READERS))}.")
+
+        def progress(report):
+            self.stdout.write(f"{report['rows']} rows, {report['rows_per_second']} rows/sec")
+
+        stream = text_stream(sys.stdin.buffer) if path == '-' else open(path, encoding='utf-8', newline='')
+        importer = CatalogImporter(chunk_size=options['chunk_size'])
+        with stream:
+            try:
+                report = importer.run(READERS[fmt](stream), progress=progress)
+            except UnicodeDecodeError:
+                raise CommandError(f"{path} is not valid UTF-8 text; the first {importer.stats['rows']} rows were imported.")
+
+        for error in report['errors']:
+            self.stderr.write(f"row {error['row']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['rows']} rows in {report['seconds']}s ({report['rows_per_second']} rows/sec): "
+            f"{report['created']} created, {report['updated']} updated, {report['skipped']} skipped."
+        ))
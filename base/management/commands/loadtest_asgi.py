@@ -0,0 +1,107 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from base.benchmark import percentile
+
+# Compare the sync DRF read endpoints with their async twins under /async/.
+# Both run through the same in-process ASGI handler that IMDB/asgi.py
+# exposes, with the same number of concurrent clients, so the only
+# difference is whether a waiting request pins a thread.
+
+DEFAULT_PAIRS = [
+    ('/movies/', '/async/movies/'),
+    ('/movies/{movie}/', '/async/movies/{movie}/'),
+    ('/movies/{movie}/reviews/', '/async/movies/{movie}/reviews/'),
+    ('/view_watchlist/', '/async/view_watchlist/'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Load-test the sync and async read endpoints through the ASGI handler and report throughput and latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent in-flight requests.')
+        parser.add_argument('--movie', type=int, help='Movie id for the detail and review endpoints.')
+        parser.add_argument('--token', help='Auth token for the watchlist endpoints; they are skipped without one.')
+        parser.add_argument('--path', action='append', dest='paths', help='Extra path to test; may be repeated.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        from base.models import Movies
+        movie = options['movie'] or Movies.objects.values_list('pk', flat=True).first()
+        paths = []
+        for pair in DEFAULT_PAIRS:
+            if '{movie}' in pair[0] and movie is None:
+                continue
+            if 'watchlist' in pair[0] and not options['token']:
+                continue
+            paths.extend(path.format(movie=movie) for path in pair)
+        paths.extend(options['paths'] or [])
+
+        results = asyncio.run(self.run_all(paths, options))
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'path':40} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for row in results:
+            self.stdout.write(f"{row['path']:40} {row['rps']:8.1f} {row['p50_ms']:8.1f} {row['p99_ms']:8.1f} {row['errors']:7}")
+
+    async def run_all(self, paths, options):
+        handler = ASGIHandler()
+        headers = [(b'authorization', f"Token {options['token']}".encode())] if options['token'] else []
+        return [await self.run_path(handler, path, headers, options) for path in paths]
+
+    async def run_path(self, handler, path, headers, options):
+        latencies, errors = [], 0
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                status = await self.request(handler, path, headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if status >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        return {
+            'path': path,
+            'rps': options['requests'] / elapsed,
+            'p50_ms': statistics.median(latencies),
+            'p99_ms': percentile(latencies, 99),
+            'errors': errors,
+        }
+
+    async def request(self, handler, path, headers):
+        url = urlsplit(path)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': url.path, 'raw_path': url.path.encode(), 'query_string': url.query.encode(),
+            'root_path': '', 'headers': [(b'host', b'localhost')] + headers,
+            'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+        }
+        status = 500
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()  # the client never disconnects mid-request
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        await handler(scope, receive, send)
+        return status
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from base.leaderboards import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the top-rated, per-genre, per-platform and trending leaderboards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        written = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} leaderboard entries.'))
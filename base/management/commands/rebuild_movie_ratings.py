@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from base.models import Movies, Reviews
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored review count and rating sum of every movie from the reviews table.'
+
+    def handle(self, *args, **options):
+        reviews = Reviews.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+        counts = reviews.annotate(total=Count('id')).values('total')
+        sums = reviews.annotate(total=Sum('ratings')).values('total')
+        with transaction.atomic():
+            updated = Movies.objects.update(
+                review_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)),
+                rating_sum=Coalesce(Subquery(sums, output_field=FloatField()), Value(0.0)),
+            )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {updated} movies.'))
@@ -0,0 +1,90 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from base.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in batches over a single SMTP connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'OUTBOX_BATCH_SIZE', 100))
+        parser.add_argument('--max-attempts', type=int, default=getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5))
+        parser.add_argument('--backoff', type=int, default=getattr(settings, 'OUTBOX_BACKOFF_SECONDS', 30),
+                            help='Base retry delay in seconds; doubles after every failed attempt.')
+        parser.add_argument('--lease', type=int, default=300,
+                            help='Seconds a claimed batch stays hidden from other workers.')
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting once the queue is empty.')
+        parser.add_argument('--sleep', type=float, default=5.0, help='Seconds to wait between polls with --loop.')
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        totals = {'sent': 0, 'retried': 0, 'dead': 0}
+        try:
+            while True:
+                batch = self.claim_batch(options['batch_size'], options['lease'])
+                if batch:
+                    for key, count in self.deliver(connection, batch, options).items():
+                        totals[key] += count
+                    continue
+                connection.close()
+                if not options['loop']:
+                    break
+                time.sleep(options['sleep'])
+        finally:
+            connection.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']}, retrying {totals['retried']}, dead-lettered {totals['dead']}."
+        ))
+
+    def claim_batch(self, size, lease):
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:size]
+            )
+            # Push the claimed rows into the future so a concurrent worker skips them
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(next_attempt_at=now + timedelta(seconds=lease))
+        return batch
+
+    def deliver(self, connection, batch, options):
+        sent, failed = [], []
+        try:
+            # Opened lazily so an idle worker holds no SMTP connection
+            connection.open()
+        except Exception as e:
+            # SMTP down or refusing our credentials: the whole batch backs off
+            for email in batch:
+                email.last_error = f'{type(e).__name__}: {e}'
+            return self.record(sent, batch, options)
+        for email in batch:
+            message = EmailMessage(email.subject, email.message, email.from_email, email.recipients, connection=connection)
+            try:
+                message.send()
+            except Exception as e:
+                email.last_error = f'{type(e).__name__}: {e}'
+                failed.append(email)
+            else:
+                sent.append(email.pk)
+        return self.record(sent, failed, options)
+
+    def record(self, sent, failed, options):
+        now = timezone.now()
+        OutboxEmail.objects.filter(pk__in=sent).update(status=OutboxEmail.SENT, sent_at=now, last_error='')
+        counts = {'sent': len(sent), 'retried': 0, 'dead': 0}
+        for email in failed:
+            email.attempts += 1
+            if email.attempts >= options['max_attempts']:
+                email.status = OutboxEmail.DEAD
+                counts['dead'] += 1
+            else:
+                email.next_attempt_at = now + timedelta(seconds=options['backoff'] * 2 ** (email.attempts - 1))
+                counts['retried'] += 1
+        OutboxEmail.objects.bulk_update(failed, ['attempts', 'status', 'next_attempt_at', 'last_error'])
+        return counts
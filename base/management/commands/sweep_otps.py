@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from base.otp import DatabaseOTPStore
+
+
+class Command(BaseCommand):
+    help = 'Delete expired email OTPs from the database OTP store (OTP_STORE = "db").'
+
+    def handle(self, *args, **options):
+        deleted = DatabaseOTPStore.sweep()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired OTPs.'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:49
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Movies = apps.get_model('base', 'Movies')
+    Reviews = apps.get_model('base', 'Reviews')
+    totals = Reviews.objects.order_by().values('movie_id').annotate(count=Count('id'), total=Sum('ratings'))
+    for row in totals.iterator():
+        Movies.objects.filter(pk=row['movie_id']).update(review_count=row['count'], rating_sum=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_alter_movies_genre'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movies',
+            name='rating_sum',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='movies',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
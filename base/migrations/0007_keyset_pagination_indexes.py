@@ -0,0 +1,25 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_movies_review_count_movies_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movies',
+            index=models.Index(fields=['-added_date', '-id'], name='movies_added_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviews',
+            index=models.Index(fields=['movie', '-added_date', '-id'], name='reviews_movie_added_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='watchlist',
+            index=models.Index(fields=['user', '-added_on', '-id'], name='watchlist_user_added_id_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+from base.search import get_backend, index_movies
+
+
+def create_search_index(apps, schema_editor):
+    backend = get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend.create(cursor)
+    Movies = apps.get_model('base', 'Movies')
+    rows = Movies.objects.using(schema_editor.connection.alias).values_list('id', 'title', 'description')
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(row)
+        if len(batch) == 2000:
+            index_movies(batch, using=schema_editor.connection.alias)
+            batch = []
+    index_movies(batch, using=schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    backend = get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend.drop(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
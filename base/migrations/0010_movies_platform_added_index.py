@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0009_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movies',
+            index=models.Index(fields=['platform', '-added_date', '-id'], name='movies_platform_added_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:01
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0010_movies_platform_added_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='phone',
+            field=models.CharField(db_index=True, help_text='Enter a 10-digit contact number', max_length=10, validators=[django.core.validators.RegexValidator(message='Contact number must be exactly 10 digits.', regex='^\\d{10}$')]),
+        ),
+    ]
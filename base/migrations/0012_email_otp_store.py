@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0011_user_phone_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOTP',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('code', models.CharField(max_length=6)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='otp',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0012_email_otp_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=50)),
+                ('score', models.FloatField()),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='base.movies')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', '-score', 'movie'], name='leaderboard_board_score_idx')],
+                'unique_together': {('board', 'movie')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0013_leaderboard_entries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingSimilarity',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='base.movies')),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SimilarMovie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_entries', to='base.movies')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.movies')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['movie', '-score'], name='similar_movie_score_idx')],
+                'unique_together': {('movie', 'similar')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:17
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0014_similar_movies'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='phone',
+            field=models.CharField(help_text='Enter a 10-digit contact number', max_length=10, unique=True, validators=[django.core.validators.RegexValidator(message='Contact number must be exactly 10 digits.', regex='^\\d{10}$')]),
+        ),
+        migrations.AddIndex(
+            model_name='movies',
+            index=models.Index(fields=['active', '-added_date', '-id'], name='movies_active_added_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reviews',
+            index=models.Index(fields=['email', '-added_date'], name='reviews_email_added_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+import math
+
+from django.db import migrations
+
+
+def to_log_scores(apps, schema_editor):
+    # Trending scores are now log2 of the summed review weights
+    LeaderboardEntry = apps.get_model('base', 'LeaderboardEntry')
+    entries = list(LeaderboardEntry.objects.filter(board='trending', score__gt=0))
+    for entry in entries:
+        entry.score = math.log2(entry.score)
+    LeaderboardEntry.objects.bulk_update(entries, ['score'], batch_size=2000)
+
+
+def from_log_scores(apps, schema_editor):
+    LeaderboardEntry = apps.get_model('base', 'LeaderboardEntry')
+    entries = list(LeaderboardEntry.objects.filter(board='trending'))
+    for entry in entries:
+        entry.score = 2 ** entry.score
+    LeaderboardEntry.objects.bulk_update(entries, ['score'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0015_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_log_scores, from_log_scores),
+    ]
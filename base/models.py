@@ -1,6 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinLengthValidator
-from django.db.models import Avg
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from .validators import validate_password, contact_validator
 # Create your models here.
@@ -36,10 +37,9 @@ class User(AbstractUser):
     username = models.CharField(max_length=300, null=True, blank=True)
     gender = models.CharField(max_length=100, choices=[('male', 'Male'), ('female', 'Female'), ('others', 'Others')])
     address = models.CharField(max_length=300)
-    phone = models.CharField(max_length=10, help_text="Enter a 10-digit contact number", validators=[contact_validator])
+    phone = models.CharField(max_length=10, unique=True, help_text="Enter a 10-digit contact number", validators=[contact_validator])
     name = models.CharField(max_length=600, blank=True, editable=False)
     is_email_verified = models.BooleanField(default=False)
-    otp = models.CharField(max_length=6, null=True, blank=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
@@ -82,17 +82,40 @@ class Movies(models.Model):
     link = models.URLField(unique=True)
     added_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
+    # Stored review aggregates, kept in step with the reviews table so that
+    # reading `rating` never has to run an AVG over the reviews.
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.FloatField(default=0, editable=False)
     
     def __str__(self):
         return self.title
     @property
     def rating(self):
-        avg_rating = self.reviews.aggregate(average=Avg('ratings'))['average']
+        return self.adjusted_rating(self.review_count, self.rating_sum)
+
+    @staticmethod
+    def adjusted_rating(count, total):
         # Default to a neutral rating if there are no reviews
-        if avg_rating is None:
+        if not count:
             return 5
-        # Calculate adjusted rating, ensuring it does not exceed 5
+        avg_rating = total / count
+        # Calculate adjusted rating, ensuring it does not exceed 10
         return min(avg_rating + 3.5, 10)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-added_date', '-id'], name='movies_added_date_id_idx'),
+            models.Index(fields=['platform', '-added_date', '-id'], name='movies_platform_added_id_idx'),
+            models.Index(fields=['active', '-added_date', '-id'], name='movies_active_added_id_idx'),
+        ]
+
+    @classmethod
+    def apply_review_delta(cls, movie_id, count, ratings):
+        """Atomically shift the stored aggregates of a movie by a review delta."""
+        cls.objects.filter(pk=movie_id).update(
+            review_count=F('review_count') + count,
+            rating_sum=F('rating_sum') + ratings,
+        )
     
 class Reviews(models.Model):
     email = models.EmailField()
@@ -101,6 +124,13 @@ class Reviews(models.Model):
     ratings = models.FloatField()
     comment = models.TextField()
     added_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['movie', '-added_date', '-id'], name='reviews_movie_added_id_idx'),
+            # A reviewer's history, newest first
+            models.Index(fields=['email', '-added_date'], name='reviews_email_added_idx'),
+        ]
     def __str__(self):
         return (self.movie.title + ' => ' + str(self.ratings)+ '  rating')
     
@@ -113,5 +143,89 @@ class Watchlist(models.Model):
 
     class Meta:
         unique_together = ('user', 'movie')
+        indexes = [
+            models.Index(fields=['user', '-added_on', '-id'], name='watchlist_user_added_id_idx'),
+        ]
+    def __str__(self):
+        return self.movie.title
+
+class OutboxEmail(models.Model):
+    # Mail is queued here inside the request transaction and delivered by
+    # the send_queued_mail worker, so SMTP never sits on the request path.
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (DEAD, 'Dead')]
+
+    subject = models.CharField(max_length=300)
+    message = models.TextField()
+    from_email = models.CharField(max_length=300)
+    recipients = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} => {", ".join(self.recipients)}'
+
+
+class EmailOTP(models.Model):
+    # Database backend of base.otp, for deployments without a shared cache
+    email = models.EmailField(unique=True)
+    code = models.CharField(max_length=6)
+    attempts = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.email
+
+
+class LeaderboardEntry(models.Model):
+    # Precomputed ranking rows kept by base/leaderboards.py; a board is read
+    # as a range scan of the (board, -score) index, so top-N costs O(N)
+    board = models.CharField(max_length=50)
+    movie = models.ForeignKey(Movies, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('board', 'movie')
+        indexes = [
+            models.Index(fields=['board', '-score', 'movie'], name='leaderboard_board_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.board} => {self.movie_id} ({self.score})'
+
+
+class SimilarMovie(models.Model):
+    # Top-K watchlist neighbours written by `manage.py build_similar_movies`;
+    # /movies/<pk>/similar/ reads them as one range scan of the (movie, -score) index
+    movie = models.ForeignKey(Movies, on_delete=models.CASCADE, related_name='similar_entries')
+    similar = models.ForeignKey(Movies, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('movie', 'similar')
+        indexes = [
+            models.Index(fields=['movie', '-score'], name='similar_movie_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.movie_id} => {self.similar_id} ({self.score})'
+
+
+class PendingSimilarity(models.Model):
+    # Movies whose watchlist rows changed since the last similarity build
+    movie = models.OneToOneField(Movies, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    queued_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return self.movie.title
\ No newline at end of file
+        return str(self.movie_id)
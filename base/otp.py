@@ -0,0 +1,127 @@
+import logging
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import BaseUserManager
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from .models import EmailOTP
+
+logger = logging.getLogger(__name__)
+
+# Email verification codes, kept out of the User row. Codes expire after
+# OTP_TTL_SECONDS (the 5 minutes the email promises) and are burnt after
+# OTP_MAX_ATTEMPTS wrong guesses. OTP_STORE picks the backend: 'cache'
+# (default, OTP_CACHE_ALIAS) or 'db', the EmailOTP table whose expired rows
+# are removed by `manage.py sweep_otps`.
+#
+# The cache store falls back to the table while its cache is unreachable,
+# as the throttles do, and looks there for codes it has no entry for, so a
+# code issued during an outage still verifies afterwards. Emails are
+# normalised as UserManager stores them, so the key a code is filed under
+# always matches the User row it verifies.
+
+VERIFIED = 'verified'
+INVALID = 'invalid'
+EXPIRED = 'expired'
+LOCKED = 'locked'
+
+
+def generate_otp():
+    return str(random.SystemRandom().randint(100000, 999999))
+
+
+def otp_ttl():
+    return getattr(settings, 'OTP_TTL_SECONDS', 300)
+
+
+def max_attempts():
+    return getattr(settings, 'OTP_MAX_ATTEMPTS', 5)
+
+
+def normalize_email(email):
+    return BaseUserManager.normalize_email(email.strip())
+
+
+class CacheOTPStore:
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'OTP_CACHE_ALIAS', 'default')]
+        self.fallback = DatabaseOTPStore()
+
+    def keys(self, email):
+        email = normalize_email(email)
+        return f'otp:{email}', f'otp-attempts:{email}'
+
+    def issue(self, email):
+        try:
+            return self.issue_cached(email)
+        except Exception:
+            logger.warning('OTP cache unavailable, storing the code in the database.', exc_info=True)
+            return self.fallback.issue(email)
+
+    def verify(self, email, code):
+        try:
+            result = self.verify_cached(email, code)
+        except Exception:
+            logger.warning('OTP cache unavailable, checking the database.', exc_info=True)
+            return self.fallback.verify(email, code)
+        # No cached code: it may have been issued while the cache was down
+        return self.fallback.verify(email, code) if result == EXPIRED else result
+
+    def issue_cached(self, email):
+        code = generate_otp()
+        code_key, attempts_key = self.keys(email)
+        self.cache.set_many({code_key: code, attempts_key: 0}, otp_ttl())
+        return code
+
+    def verify_cached(self, email, code):
+        code_key, attempts_key = self.keys(email)
+        stored = self.cache.get(code_key)
+        if stored is None:
+            return EXPIRED
+        if constant_time_compare(stored, code):
+            self.cache.delete_many([code_key, attempts_key])
+            return VERIFIED
+        try:
+            attempts = self.cache.incr(attempts_key)
+        except ValueError:
+            return EXPIRED
+        if attempts >= max_attempts():
+            self.cache.delete_many([code_key, attempts_key])
+            return LOCKED
+        return INVALID
+
+
+class DatabaseOTPStore:
+    def issue(self, email):
+        code = generate_otp()
+        EmailOTP.objects.update_or_create(
+            email=normalize_email(email),
+            defaults={'code': code, 'attempts': 0, 'expires_at': timezone.now() + timedelta(seconds=otp_ttl())},
+        )
+        return code
+
+    def verify(self, email, code):
+        otp = EmailOTP.objects.filter(email=normalize_email(email), expires_at__gt=timezone.now()).first()
+        if otp is None:
+            return EXPIRED
+        if constant_time_compare(otp.code, code):
+            otp.delete()
+            return VERIFIED
+        if otp.attempts + 1 >= max_attempts():
+            otp.delete()
+            return LOCKED
+        EmailOTP.objects.filter(pk=otp.pk).update(attempts=F('attempts') + 1)
+        return INVALID
+
+    @staticmethod
+    def sweep():
+        return EmailOTP.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+def get_otp_store():
+    if getattr(settings, 'OTP_STORE', 'cache') == 'db':
+        return DatabaseOTPStore()
+    return CacheOTPStore()
@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+# Keyset pagination: every page is a range scan on an index that matches the
+# ordering, so deep pages cost the same as the first one (no OFFSET).
+
+class MovieCursorPagination(CursorPagination):
+    ordering = ('-added_date', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class ReviewCursorPagination(CursorPagination):
+    ordering = ('-added_date', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class WatchlistCursorPagination(CursorPagination):
+    # Annotations view_watchlist puts on Movies from the joined Watchlist row
+    ordering = ('-watchlist_added_on', '-watchlist_id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
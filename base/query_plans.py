@@ -0,0 +1,66 @@
+import re
+from django.db import connection, transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from .models import EmailOTP, LeaderboardEntry, Movies, OutboxEmail, Reviews, SimilarMovie, User, Watchlist
+
+# The main query behind each hot endpoint, for `manage.py check_query_plans`.
+# Each is EXPLAINed and must be answered from an index. PostgreSQL is told to
+# avoid sequential scans while planning, otherwise it picks them for small
+# development tables and the check would say nothing about production.
+#
+# Endpoints that list a whole small table (platforms, genres) and the
+# `?search=` icontains filter are full scans by design and are not listed.
+
+PAGE = 21  # page size + 1, as the cursor paginators fetch it
+
+
+def hot_queries():
+    return [
+        ('GET /movies/', Movies.objects.select_related('platform').order_by('-added_date', '-id')[:PAGE]),
+        ('GET /movies/?active=', Movies.objects.filter(active=True).order_by('-added_date', '-id')[:PAGE]),
+        ('GET /movies/?platform=', Movies.objects.filter(platform_id=1).order_by('-added_date', '-id')[:PAGE]),
+        ('GET /movies/<pk>/', Movies.objects.select_related('platform').filter(pk=1)),
+        ('GET /movies/<pk>/reviews/', Reviews.objects.filter(movie_id=1).order_by('-added_date', '-id')[:PAGE]),
+        ('GET /movies/<pk>/reviews/stats/', Reviews.objects.filter(movie_id__in=[1, 2]).values('movie_id').annotate(count=Count('id'), mean=Avg('ratings')).order_by()),
+        ('GET /movies/<pk>/similar/', SimilarMovie.objects.filter(movie_id=1).order_by('-score', 'similar_id')[:10]),
+        ('GET /leaderboards/top/', LeaderboardEntry.objects.filter(board='top').order_by('-score', 'movie_id')[:10]),
+        ('reviewer history', Reviews.objects.filter(email='reviewer@example.com').order_by('-added_date')[:PAGE]),
+        ('POST /register/ phone check', User.objects.filter(phone='9800000000').values('pk')[:1]),
+        ('POST /login/', User.objects.filter(email='user@example.com')),
+        ('token authentication', Token.objects.select_related('user').filter(key='0' * 40)),
+        ('POST /verify/', EmailOTP.objects.filter(email='user@example.com', expires_at__gt=timezone.now())[:1]),
+        ('GET /view_watchlist/', Watchlist.objects.filter(user_id=1).order_by('-added_on', '-id')[:PAGE]),
+        ('send_queued_mail', OutboxEmail.objects.filter(status=OutboxEmail.PENDING, next_attempt_at__lte=timezone.now()).order_by('next_attempt_at', 'id')[:100]),
+    ]
+
+
+FULL_SCAN = {
+    # "SCAN base_movies" reads the table; "SCAN t USING [COVERING] INDEX i" walks an index
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(?!CONSTANT ROW)(\w+)(?! USING)(?:\s|$)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+def full_scans(plan, vendor=None):
+    """Tables a plan reads in full."""
+    pattern = FULL_SCAN[vendor or connection.vendor]
+    return pattern.findall(plan)
+
+
+def explain(queryset):
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def check_plans():
+    """Yield (label, plan, tables read in full) for every hot query."""
+    if connection.vendor not in FULL_SCAN:
+        raise NotImplementedError(f'No plan checks for {connection.vendor}.')
+    for label, queryset in hot_queries():
+        plan = explain(queryset)
+        yield label, plan, full_scans(plan)
@@ -0,0 +1,57 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# MessagePack bodies for clients that send `Accept: application/msgpack` (or
+# `?format=msgpack`) and `Content-Type: application/msgpack`. The catalog and
+# review views offer it next to the default JSON; for every endpoint list the
+# classes in settings instead:
+#
+#     REST_FRAMEWORK = {
+#         'DEFAULT_RENDERER_CLASSES': [..., 'base.renderers.MessagePackRenderer'],
+#         'DEFAULT_PARSER_CLASSES': [..., 'base.renderers.MessagePackParser'],
+#     }
+#
+# Values MessagePack has no type for (dates, decimals, UUIDs) become the same
+# strings the JSON renderer writes. Without the msgpack package installed the
+# views serve JSON only. `manage.py benchmark_response_formats` compares the
+# sizes and render times with JSON.
+
+MEDIA_TYPE = 'application/msgpack'
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    media_type = MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
+
+
+def compact(classes, extra):
+    return [*classes, extra] if msgpack is not None else list(classes)
+
+
+RENDERER_CLASSES = compact(api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer)
+PARSER_CLASSES = compact(api_settings.DEFAULT_PARSER_CLASSES, MessagePackParser)
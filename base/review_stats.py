@@ -0,0 +1,81 @@
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Q
+from .caching import response_cache
+from .models import Movies, Reviews
+from .routers import lag_seconds, may_be_stale
+
+# Rating summaries for /movies/<pk>/reviews/stats/ and the batch form
+# /movies/reviews/stats/?ids=1,2,3. Every movie's summary is cached under its
+# own key until a review of that movie is written (the review views call
+# invalidate()), so one busy movie does not evict the others. Cache misses
+# are computed together in a single GROUP BY over the reviews index.
+
+BUCKETS = range(1, 11)  # ratings are validated to 1..10; 9.5 counts in bucket 9
+
+
+def stats_key(movie_id):
+    return f'review-stats:{movie_id}'
+
+
+def bucket_filter(bucket):
+    if bucket == BUCKETS[-1]:
+        return Q(ratings__gte=bucket)
+    return Q(ratings__gte=bucket, ratings__lt=bucket + 1)
+
+
+def empty_stats(movie_id):
+    return {
+        'movie': movie_id, 'count': 0, 'mean': None, 'rating': Movies.adjusted_rating(0, 0),
+        'distribution': {str(bucket): 0 for bucket in BUCKETS}, 'latest': None,
+    }
+
+
+def compute(movie_ids):
+    """Summaries for the given movies in one grouped query."""
+    stats = {movie_id: empty_stats(movie_id) for movie_id in movie_ids}
+    rows = (
+        Reviews.objects.filter(movie_id__in=movie_ids)
+        .values('movie_id')
+        .annotate(
+            count=Count('id'), mean=Avg('ratings'), latest=Max('added_date'),
+            **{f'bucket_{bucket}': Count('id', filter=bucket_filter(bucket)) for bucket in BUCKETS},
+        )
+        .order_by()
+    )
+    for row in rows:
+        stats[row['movie_id']].update(
+            count=row['count'],
+            mean=row['mean'],
+            rating=Movies.adjusted_rating(row['count'], row['mean'] * row['count']),
+            distribution={str(bucket): row[f'bucket_{bucket}'] for bucket in BUCKETS},
+            latest=row['latest'],
+        )
+    return stats
+
+
+def get_stats(movie_ids):
+    cache = response_cache()
+    cached = cache.get_many([stats_key(movie_id) for movie_id in movie_ids])
+    # An invalidated movie holds the time of its last review write instead of a summary
+    stats = {movie_id: cached[stats_key(movie_id)] for movie_id in movie_ids if 'count' in cached.get(stats_key(movie_id), {})}
+    missing = [movie_id for movie_id in movie_ids if movie_id not in stats]
+    if missing:
+        computed = compute(missing)
+        cache.set_many(
+            {
+                stats_key(movie_id): value for movie_id, value in computed.items()
+                # Summaries read from a lagging replica are served but not cached
+                if not may_be_stale(cached.get(stats_key(movie_id), {}).get('changed_at', 0))
+            },
+            getattr(settings, 'REVIEW_STATS_TIMEOUT', 3600),
+        )
+        stats.update(computed)
+    return [stats[movie_id] for movie_id in movie_ids]
+
+
+def invalidate(movie_ids):
+    keys = [stats_key(movie_id) for movie_id in movie_ids]
+    # After commit, otherwise a concurrent read could cache the pre-write summary again
+    transaction.on_commit(lambda: response_cache().set_many({key: {'changed_at': time.time()} for key in keys}, lag_seconds()))
@@ -0,0 +1,122 @@
+import hashlib
+import random
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Read replicas for safe-method requests. Enable with
+#
+#     DATABASES = {'default': {...}, 'replica1': {...}, 'replica2': {...}}
+#     DATABASE_REPLICAS = {'replica1': 3, 'replica2': 1}    # alias -> weight
+#     DATABASE_ROUTERS = ['base.routers.ReplicaRouter']
+#     MIDDLEWARE = [..., 'base.routers.ReplicaRoutingMiddleware', ...]
+#
+# GET/HEAD/OPTIONS requests read from one replica, picked by weight once per
+# request so all of its queries see the same snapshot. Everything else, and
+# any read outside a request (management commands, the outbox worker) or
+# inside a transaction, uses the primary. A write also sends the rest of
+# that request to the primary.
+#
+# Replicas can trail the primary by up to REPLICA_LAG_SECONDS (default 5).
+# For that long after a successful write, the same client reads from the
+# primary so it sees its own changes. The client is identified by its
+# Authorization header, pinned in the cache, or by a cookie when it sends
+# none.
+#
+# To try it locally with two SQLite files, migrate, copy db.sqlite3 to
+# replica.sqlite3 and add it as the 'replica' alias.
+
+PIN_COOKIE = 'primary_until'
+
+current = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.replica = None
+        self.wrote = False
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', {})
+
+
+def lag_seconds():
+    return getattr(settings, 'REPLICA_LAG_SECONDS', 5)
+
+
+def pin_key(request):
+    header = request.headers.get('Authorization')
+    if not header:
+        return None
+    return 'replica-pin:' + hashlib.sha256(header.encode()).hexdigest()[:32]
+
+
+def may_be_stale(changed_at):
+    """Whether this request read from a replica that may not have the change made at `changed_at` yet."""
+    state = current.get()
+    return (
+        state is not None and state.replica not in (None, DEFAULT_DB_ALIAS)
+        and time.time() - changed_at < lag_seconds()
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current.get()
+        if state is None or state.wrote or not state.use_replica or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            weights = replicas()
+            state.replica = random.choices(list(weights), weights=list(weights.values()))[0] if weights else DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db not in replicas()
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        safe = request.method in ('GET', 'HEAD', 'OPTIONS')
+        state = RoutingState(use_replica=safe and bool(replicas()) and not self.pinned(request))
+        token = current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        if (state.wrote or not safe) and response.status_code < 400 and replicas():
+            self.pin(request, response)
+        return response
+
+    def pinned(self, request):
+        try:
+            if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        key = pin_key(request)
+        return key is not None and cache.get(key) is not None
+
+    def pin(self, request, response):
+        lag = lag_seconds()
+        key = pin_key(request)
+        if key is not None:
+            cache.set(key, 1, lag)
+        response.set_cookie(PIN_COOKIE, str(time.time() + lag), max_age=lag, httponly=True, samesite='Lax')
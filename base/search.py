@@ -0,0 +1,120 @@
+import re
+from django.db import connections, DEFAULT_DB_ALIAS
+
+# Full-text index over Movies.title and Movies.description. Each database
+# vendor gets its own backend behind the same small interface; vendors
+# without one return None from search_movies() so callers can fall back to
+# a plain icontains filter.
+
+FTS_TABLE = 'base_movies_fts'
+SEARCH_TABLE = 'base_movies_search'
+
+
+def _terms(query):
+    # Only keep word characters so user input can never inject query syntax
+    return re.findall(r'\w+', query.lower())
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table whose rowid is the movie id."""
+
+    def create(self, cursor):
+        cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(title, description, tokenize='unicode61')")
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+    def index(self, cursor, rows):
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)', rows)
+
+    def remove(self, cursor, ids):
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in ids])
+
+    def search(self, cursor, terms, limit):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # bm25() is lower-is-better; a title hit weighs ten times a description hit
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}, 10.0, 1.0) LIMIT %s',
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    """Side table holding a weighted tsvector per movie, with a GIN index."""
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            'movie_id bigint PRIMARY KEY REFERENCES base_movies (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)')
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (movie_id, document) VALUES '
+            "(%s, setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B')) "
+            'ON CONFLICT (movie_id) DO UPDATE SET document = EXCLUDED.document',
+            rows,
+        )
+
+    def remove(self, cursor, ids):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE movie_id = ANY(%s)', [list(ids)])
+
+    def search(self, cursor, terms, limit):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        cursor.execute(
+            f"SELECT movie_id FROM {SEARCH_TABLE}, to_tsquery('english', %s) query "
+            'WHERE document @@ query ORDER BY ts_rank(document, query) DESC LIMIT %s',
+            [tsquery, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend(),
+    'postgresql': PostgresSearchBackend(),
+}
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor)
+
+
+def index_movies(rows, using=DEFAULT_DB_ALIAS):
+    """(Re)index an iterable of (id, title, description) tuples."""
+    connection = connections[using]
+    backend = get_backend(connection)
+    rows = [tuple(row) for row in rows]
+    if backend is None or not rows:
+        return
+    with connection.cursor() as cursor:
+        backend.index(cursor, rows)
+
+
+def remove_movies(ids, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    backend = get_backend(connection)
+    ids = list(ids)
+    if backend is None or not ids:
+        return
+    with connection.cursor() as cursor:
+        backend.remove(cursor, ids)
+
+
+def search_movies(query, limit, using=DEFAULT_DB_ALIAS):
+    """Return movie ids best match first, or None if the database has no full-text backend."""
+    connection = connections[using]
+    backend = get_backend(connection)
+    if backend is None:
+        return None
+    terms = _terms(query)
+    if not terms:
+        return []
+    with connection.cursor() as cursor:
+        return backend.search(cursor, terms, limit)
@@ -2,17 +2,47 @@ from rest_framework import serializers
 from .models import *
 from .validators import validate_password, contact_validator
 from django.core.exceptions import ValidationError
+from django.conf import settings
+from .instrumentation import TimedSerializerMixin
 
-class PlatformSerializer(serializers.ModelSerializer):
+# How many titles each platform lists inline; the rest is paged at /platform/<pk>/movies/
+PLATFORM_MOVIE_TITLES = getattr(settings, 'PLATFORM_MOVIE_TITLES', 10)
+
+class PlatformSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     # For Hyperlinked movies
     # movies = serializers.HyperlinkedRelatedField(view_name='movies_detail',  # Name of the view that provides the URL for Movies many=True,read_only=True
     # many=True, read_only=True)
-    movies = serializers.StringRelatedField(many=True, read_only=True)
+    # movie_count comes from a COUNT annotation and movies from a capped
+    # prefetch of titles (see PlatformApiViewSet); ?movies=count drops the titles
+    movie_count = serializers.SerializerMethodField()
+    movies = serializers.SerializerMethodField()
     class Meta:
         model = Platform
         fields = '__all__'
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None and request.query_params.get('movies') == 'count':
+            fields.pop('movies')
+        return fields
+
+    def get_movie_count(self, instance):
+        if hasattr(instance, 'movie_count'):
+            return instance.movie_count
+        return instance.movies.count()
+
+    def get_movies(self, instance):
+        if hasattr(instance, 'movie_sample'):
+            return [movie.title for movie in instance.movie_sample]
+        return list(instance.movies.order_by('title').values_list('title', flat=True)[:PLATFORM_MOVIE_TITLES])
+
+class PlatformMovieSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Movies
+        fields = ['id', 'title', 'release_year', 'link', 'added_date']
         
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         representation['movie'] = instance.movie.title if instance.movie else None
@@ -26,19 +56,67 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Ratings should be between 1 and 10")
         return value
     
-class MovieGenreSerializer(serializers.ModelSerializer):
+class ReviewBatchItemSerializer(ReviewSerializer):
+    # Movies are looked up once for the whole batch and passed in the context
+    movie = serializers.IntegerField()
+
+    def validate_movie(self, value):
+        movie = self.context['movies'].get(value)
+        if movie is None:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return movie
+    
+class MovieGenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = MovieGenre
         fields = '__all__'
-class MovieSerializer(serializers.ModelSerializer):
+# Columns each MovieSerializer field reads, so sparse reads can defer the rest
+MOVIE_FIELD_COLUMNS = {
+    'id': ['id'],
+    'title': ['title'],
+    'description': ['description'],
+    'rating': ['review_count', 'rating_sum'],
+    'release_year': ['release_year'],
+    'genre': [],
+    'active': ['active'],
+    'link': ['link'],
+    'platform': ['platform__name'],
+    'added_date': ['added_date'],
+    'updated_date': ['updated_date'],
+}
+
+def movie_fields(request):
+    """The fields a read asked for with ?fields=a,b or ?omit=c, or None for all of them."""
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    fields = request.query_params.get('fields')
+    omit = request.query_params.get('omit')
+    if not fields and not omit:
+        return None
+    selected = [name for name in MOVIE_FIELD_COLUMNS if name in fields.split(',')] if fields else list(MOVIE_FIELD_COLUMNS)
+    if omit:
+        selected = [name for name in selected if name not in omit.split(',')]
+    return selected
+
+class MovieSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     # platform = serializers.StringRelatedField()
     # genre = serializers.StringRelatedField(many=True, read_only=True)
     genre = serializers.PrimaryKeyRelatedField(queryset=MovieGenre.objects.all(), many=True)
     rating = serializers.ReadOnlyField()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = movie_fields(self.context.get('request'))
+        if selected is not None:
+            fields = {name: field for name, field in fields.items() if name in selected}
+        return fields
+
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation['platform'] = instance.platform.name if instance.platform else None
-        representation['genre'] = [genre.name for genre in instance.genre.all()]  # Display genre names in output
+        if 'platform' in representation:
+            representation['platform'] = instance.platform.name if instance.platform else None
+        if 'genre' in representation:
+            representation['genre'] = [genre.name for genre in instance.genre.all()]  # Display genre names in output
         return representation
     class Meta:
         model = Movies
@@ -46,7 +124,7 @@ class MovieSerializer(serializers.ModelSerializer):
     # platform = PlatformSerializer()
     
         
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
     phone = serializers.CharField(required=True, validators=[contact_validator])
 
@@ -67,12 +145,15 @@ class UserSerializer(serializers.ModelSerializer):
 class VerifyAccountSerializer(serializers.Serializer):
     email = serializers.EmailField()
     otp = serializers.CharField()
+
+class ResendOTPSerializer(serializers.Serializer):
+    email = serializers.EmailField()
     
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
     
-class WatchlistSerializer(serializers.ModelSerializer):
+class WatchlistSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     movie = serializers.CharField(source='movie.title', read_only=True)  # Assuming you have a MovieSerializer
 
     class Meta:
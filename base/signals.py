@@ -0,0 +1,81 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import invalidate_token, invalidate_user
+from .caching import bump_versions
+from .models import Movies, MovieGenre, Platform, Reviews, User
+from .search import index_movies, remove_movies
+from .leaderboards import drop_board, genre_board, refresh_movies
+
+
+@receiver(post_save, sender=Movies)
+def index_movie(sender, instance, using, raw=False, **kwargs):
+    # Keep the full-text index in step with the movie row
+    index_movies([(instance.pk, instance.title, instance.description)], using=using)
+
+
+@receiver(post_save, sender=Movies)
+def rescore_movie(sender, instance, created, raw=False, **kwargs):
+    # active or platform may have changed; a movie without reviews is on no rating board
+    if not created and not raw and instance.review_count:
+        refresh_movies([instance.pk])
+
+
+@receiver(m2m_changed, sender=Movies.genre.through)
+def rescore_movie_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        refresh_movies(pk_set or [])
+    elif instance.review_count:
+        refresh_movies([instance.pk])
+
+
+@receiver(post_delete, sender=MovieGenre)
+def drop_genre_board(sender, instance, **kwargs):
+    drop_board(genre_board(instance.pk))
+
+
+@receiver(post_delete, sender=Movies)
+def unindex_movie(sender, instance, using, **kwargs):
+    remove_movies([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Token)
+def uncache_token(sender, instance, **kwargs):
+    # Logout deletes the token; it must stop authenticating straight away
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def uncache_user_tokens(sender, instance, created, **kwargs):
+    # Covers deactivation as well as any other change to the cached user
+    if not created:
+        invalidate_user(instance.pk)
+
+
+# Which cached responses embed each model (see base/caching.py)
+RESPONSE_NAMESPACES = {
+    Movies: ('movies', 'platform'),
+    Reviews: ('movies',),
+    Platform: ('platform', 'movies'),
+    MovieGenre: ('genre', 'movies'),
+}
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    bump_versions(*RESPONSE_NAMESPACES[sender])
+
+
+for model in RESPONSE_NAMESPACES:
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'invalidate_responses_save_{model.__name__}')
+# A post_delete listener on Reviews would stop Django from fast-deleting the
+# reviews of a deleted movie, so review deletes bump the version in the view.
+for model in (Movies, Platform, MovieGenre):
+    post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'invalidate_responses_delete_{model.__name__}')
+
+
+@receiver(m2m_changed, sender=Movies.genre.through)
+def invalidate_movie_genres(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_versions('movies')
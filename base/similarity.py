@@ -0,0 +1,141 @@
+import time
+from django.conf import settings
+from django.db import transaction
+from .caching import bump_versions
+from .models import PendingSimilarity, SimilarMovie, Watchlist
+
+# Item-item "similar movies" built from watchlist co-occurrence.
+#
+# `manage.py build_similar_movies` loads Watchlist as a sparse users x movies
+# matrix X and scores every pair of movies by cosine similarity,
+#
+#     cos(a, b) = |users with both| / sqrt(|users with a| * |users with b|)
+#
+# computed block by block as X[:, block].T @ X with NumPy/SciPy. The top
+# SIMILAR_MOVIES_TOP_K (default 20) neighbours of each movie are stored in
+# SimilarMovie, so /movies/<pk>/similar/ is a single indexed read.
+#
+# Watchlist writes queue their movies in PendingSimilarity. An incremental
+# run recomputes only those movies plus every movie whose cosine with them
+# may have moved: the ones they co-occur with now and the ones that listed
+# them as a neighbour before. NumPy and SciPy are only needed by the job.
+
+
+def top_k():
+    return getattr(settings, 'SIMILAR_MOVIES_TOP_K', 20)
+
+
+def queue_movies(movie_ids):
+    PendingSimilarity.objects.bulk_create([PendingSimilarity(movie_id=pk) for pk in movie_ids], ignore_conflicts=True)
+
+
+def read_similar(movie_id, limit):
+    return (
+        SimilarMovie.objects.filter(movie_id=movie_id, similar__active=True)
+        .order_by('-score', 'similar_id')
+        .select_related('similar__platform')
+        .prefetch_related('similar__genre')[:limit]
+    )
+
+
+def load_watchlist(chunk_size=50000):
+    """Return (movie ids, users x movies CSC matrix) for every watchlist row."""
+    import numpy as np
+    from scipy import sparse
+
+    pairs = np.fromiter(
+        Watchlist.objects.values_list('user_id', 'movie_id').iterator(chunk_size=chunk_size),
+        dtype=[('user', np.int64), ('movie', np.int64)],
+    )
+    users, user_index = np.unique(pairs['user'], return_inverse=True)
+    movie_ids, movie_index = np.unique(pairs['movie'], return_inverse=True)
+    # float32 keeps co-occurrence counts exact up to 2**24 shared users
+    matrix = sparse.csc_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (user_index, movie_index)),
+        shape=(len(users), len(movie_ids)),
+    )
+    return movie_ids, matrix
+
+
+def neighbours(matrix, norms, rows, k, min_count=1):
+    """Top-k cosine neighbours of the movie columns `rows`, as (row, col, score) arrays."""
+    import numpy as np
+
+    together = (matrix[:, rows].T @ matrix).tocoo()
+    keep = (together.data >= min_count) & (rows[together.row] != together.col)
+    row, col = rows[together.row[keep]], together.col[keep]
+    score = together.data[keep] / (norms[row] * norms[col])
+    # Rank within each row without a Python loop: sort by (row, -score) and
+    # subtract each row's first position
+    order = np.lexsort((col, -score, row))
+    row, col, score = row[order], col[order], score[order]
+    rank = np.arange(len(row)) - np.searchsorted(row, row)
+    keep = rank < k
+    return row[keep], col[keep], score[keep]
+
+
+def affected_rows(movie_ids, matrix, changed):
+    """Column indexes whose neighbour lists a change to the `changed` movie ids can move."""
+    import numpy as np
+
+    columns = np.flatnonzero(np.isin(movie_ids, changed))
+    touched = (matrix[:, columns].T @ matrix).tocoo().col
+    listed = SimilarMovie.objects.filter(similar_id__in=changed).values_list('movie_id', flat=True).distinct()
+    listed = np.flatnonzero(np.isin(movie_ids, np.fromiter(listed, dtype=np.int64)))
+    return np.union1d(np.union1d(columns, touched), listed)
+
+
+def take_pending():
+    with transaction.atomic():
+        pending = list(PendingSimilarity.objects.values_list('movie_id', flat=True))
+        PendingSimilarity.objects.filter(movie_id__in=pending).delete()
+    return pending
+
+
+def build(full=False, k=None, min_count=1, block_size=2000, chunk_size=50000):
+    """Recompute SimilarMovie, either everything or just what the pending queue touched."""
+    import numpy as np
+
+    started = time.monotonic()
+    k = k or top_k()
+    pending = take_pending()
+    try:
+        movie_ids, matrix = load_watchlist(chunk_size)
+        norms = np.sqrt(np.asarray(matrix.sum(axis=0)).ravel())
+        if full:
+            rows = np.arange(len(movie_ids))
+        elif pending:
+            rows = affected_rows(movie_ids, matrix, pending)
+        else:
+            rows = np.arange(0)
+
+        written = 0
+        with transaction.atomic():
+            if full:
+                SimilarMovie.objects.all().delete()
+            else:
+                # Pending movies that left every watchlist have no row to recompute
+                SimilarMovie.objects.filter(movie_id__in=pending).delete()
+            for start in range(0, len(rows), block_size):
+                block = rows[start:start + block_size]
+                if not full:
+                    SimilarMovie.objects.filter(movie_id__in=movie_ids[block].tolist()).delete()
+                row, col, score = neighbours(matrix, norms, block, k, min_count)
+                written += len(SimilarMovie.objects.bulk_create(
+                    [
+                        SimilarMovie(movie_id=a, similar_id=b, score=s)
+                        for a, b, s in zip(movie_ids[row].tolist(), movie_ids[col].tolist(), score.tolist())
+                    ],
+                    batch_size=chunk_size,
+                ))
+    except Exception:
+        queue_movies(pending)
+        raise
+    if full or pending:
+        bump_versions('movies')
+    return {
+        'watchlist_rows': int(matrix.nnz),
+        'movies': len(rows),
+        'entries': written,
+        'seconds': round(time.monotonic() - started, 3),
+    }
@@ -0,0 +1,164 @@
+import datetime
+import io
+import random
+import time
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from .caching import bump_versions
+from .leaderboards import rebuild as rebuild_leaderboards
+from .models import Movies, MovieGenre, Platform, Reviews, User, Watchlist
+from .search import index_movies
+
+# Seeded synthetic catalog for `manage.py generate_synthetic_data` and the
+# endpoint benchmarks. The same seed and sizes always produce the same rows
+# (ids aside), so benchmark runs on different commits are comparable.
+#
+# Every generated row is recognisable: names start with "Bench", emails and
+# links use DOMAIN. Users share PASSWORD, hashed once; ADMIN_EMAIL is a
+# superuser and user-0 owns a watchlist, for the authenticated routes.
+# Review popularity is skewed so a few movies carry most of the reviews.
+# Reviews and watchlist rows, the millions, go in with plain executemany
+# INSERTs: bulk_create spends most of its time building and compiling
+# model instances at that size.
+
+DOMAIN = 'bench.example.com'
+PASSWORD = 'Bench@1234'
+ADMIN_EMAIL = f'admin@{DOMAIN}'
+WORDS = [
+    'Silent', 'Crimson', 'Last', 'Hidden', 'Broken', 'Golden', 'Midnight', 'Lost', 'Iron', 'Wild',
+    'River', 'Empire', 'Shadow', 'Garden', 'Signal', 'Harbor', 'Winter', 'Echo', 'Orbit', 'Storm',
+]
+
+
+def user_email(n):
+    return f'user-{n}@{DOMAIN}'
+
+
+def insert_rows(model, fields, rows):
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})', rows)
+
+
+class SyntheticData:
+    def __init__(self, seed=42, chunk_size=5000):
+        self.random = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.stats = {}
+
+    def run(self, platforms=20, genres=25, users=20000, movies=100000, reviews=5000000, watchlist=1000000, progress=None):
+        started = time.monotonic()
+        self.progress = progress or (lambda message: None)
+        if Platform.objects.filter(url__startswith=f'https://{DOMAIN}/').exists():
+            raise ValueError('Synthetic data is already present; generate into a fresh database.')
+        platform_ids = self.create_platforms(platforms)
+        genre_ids = self.create_genres(genres)
+        user_ids = self.create_users(users)
+        movie_ids = self.create_movies(movies, platform_ids, genre_ids)
+        self.create_reviews(reviews, movie_ids, users)
+        self.create_watchlist(watchlist, user_ids, movie_ids)
+
+        self.progress('Rebuilding rating aggregates and leaderboards')
+        call_command('rebuild_movie_ratings', stdout=io.StringIO())
+        rebuild_leaderboards()
+        bump_versions('movies', 'platform', 'genre')
+        return dict(self.stats, seconds=round(time.monotonic() - started, 1))
+
+    def chunks(self, total):
+        for start in range(0, total, self.chunk_size):
+            yield range(start, min(start + self.chunk_size, total))
+
+    def create_platforms(self, count):
+        Platform.objects.bulk_create([Platform(name=f'Bench Platform {i}', url=f'https://{DOMAIN}/platform/{i}') for i in range(count)])
+        self.stats['platforms'] = count
+        return list(Platform.objects.filter(url__startswith=f'https://{DOMAIN}/').order_by('pk').values_list('pk', flat=True))
+
+    def create_genres(self, count):
+        MovieGenre.objects.bulk_create([MovieGenre(name=f'Bench Genre {i}') for i in range(count)])
+        self.stats['genres'] = count
+        return list(MovieGenre.objects.filter(name__startswith='Bench Genre ').order_by('pk').values_list('pk', flat=True))
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        admin = User(
+            email=ADMIN_EMAIL, username=ADMIN_EMAIL, password=password, first_name='Bench', last_name='Admin', name='Bench Admin',
+            age=30, gender='others', address='Benchmark', phone='9700000000', is_email_verified=True, is_staff=True, is_superuser=True,
+        )
+        User.objects.bulk_create([admin])
+        for chunk in self.chunks(count):
+            User.objects.bulk_create([
+                User(
+                    email=user_email(n), username=user_email(n), password=password, first_name='Bench', last_name=f'User {n}',
+                    name=f'Bench User {n}', age=self.random.randint(13, 80), gender=self.random.choice(['male', 'female', 'others']),
+                    address='Benchmark', phone=f'98{n:08d}', is_email_verified=True,
+                )
+                for n in chunk
+            ])
+        self.stats['users'] = count
+        self.progress(f'{count} users')
+        return list(User.objects.filter(email__startswith='user-', email__endswith=f'@{DOMAIN}').order_by('pk').values_list('pk', flat=True))
+
+    def create_movies(self, count, platform_ids, genre_ids):
+        Through = Movies.genre.through
+        start_date = datetime.date(1950, 1, 1)
+        for chunk in self.chunks(count):
+            with transaction.atomic():
+                movies = Movies.objects.bulk_create([
+                    Movies(
+                        title=f'{self.random.choice(WORDS)} {self.random.choice(WORDS)} {n}',
+                        description=' '.join(self.random.choices(WORDS, k=12)),
+                        release_year=start_date + datetime.timedelta(days=self.random.randrange(75 * 365)),
+                        active=self.random.random() < 0.95,
+                        link=f'https://{DOMAIN}/movies/{n}',
+                        platform_id=self.random.choice(platform_ids),
+                    )
+                    for n in chunk
+                ])
+                if movies[0].pk is None:
+                    # Backends without RETURNING on bulk inserts
+                    movies = list(Movies.objects.filter(link__in=[movie.link for movie in movies]))
+                Through.objects.bulk_create([
+                    Through(movies_id=movie.pk, moviegenre_id=genre_id)
+                    for movie in movies
+                    for genre_id in self.random.sample(genre_ids, self.random.randint(1, 3))
+                ])
+                index_movies([(movie.pk, movie.title, movie.description) for movie in movies])
+            self.progress(f'{chunk.stop} movies')
+        self.stats['movies'] = count
+        return list(Movies.objects.filter(link__startswith=f'https://{DOMAIN}/').order_by('pk').values_list('pk', flat=True))
+
+    def create_reviews(self, count, movie_ids, users):
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        for chunk in self.chunks(count):
+            insert_rows(Reviews, ['email', 'full_name', 'movie', 'ratings', 'comment', 'added_date'], [
+                (
+                    user_email(self.random.randrange(max(users, 1))), 'Bench Reviewer',
+                    # Squaring a uniform draw skews reviews towards the first movies
+                    movie_ids[int(len(movie_ids) * self.random.random() ** 2)],
+                    float(self.random.randint(1, 10)), ' '.join(self.random.choices(WORDS, k=8)), now,
+                )
+                for n in chunk
+            ])
+            if chunk.stop % (self.chunk_size * 100) == 0 or chunk.stop == count:
+                self.progress(f'{chunk.stop} reviews')
+        self.stats['reviews'] = count
+
+    def create_watchlist(self, count, user_ids, movie_ids):
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        fields = ['user', 'movie', 'added_on']
+        per_user, extra = divmod(count, max(len(user_ids), 1))
+        rows, written = [], 0
+        for i, user_id in enumerate(user_ids):
+            size = min(per_user + (i < extra), len(movie_ids))
+            written += size
+            rows.extend((user_id, movie_id, now) for movie_id in self.random.sample(movie_ids, size))
+            if len(rows) >= self.chunk_size:
+                insert_rows(Watchlist, fields, rows)
+                rows = []
+        insert_rows(Watchlist, fields, rows)
+        self.stats['watchlist'] = written
+        self.progress(f'{written} watchlist rows')
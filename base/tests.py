@@ -1,3 +1,904 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import os
+import re
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from rest_framework.exceptions import AuthenticationFailed
+from .authentication import CachedTokenAuthentication, invalidate_user, local_cache
+from .benchmark import compare, unbenchmarked_routes
+from .compression import negotiate
+from .importer import CatalogImporter
+from . import leaderboards
+from .query_plans import full_scans
+from .renderers import msgpack
+from .routers import ReplicaRouter, ReplicaRoutingMiddleware
+from .instrumentation import collect
+from .serializers import MovieSerializer
+from .otp import EXPIRED, INVALID, LOCKED, VERIFIED, get_otp_store
+from .models import *
 
-# Create your tests here.
+try:
+    import scipy
+except ImportError:
+    scipy = None
+
+# Maximum number of SQL queries each endpoint in base/urls.py may run.
+# The fixture below creates several rows per table, so an N+1 pattern pushes
+# the count over its budget and fails the suite.
+QUERY_BUDGETS = {
+    ('movies', 'get'): 2,
+    ('movies', 'post'): 19,
+    ('movie_export', 'get'): 3,
+    ('movie_import', 'post'): 14,
+    ('movies_detail', 'get'): 2,
+    ('movies_detail', 'put'): 26,
+    ('movies_detail', 'patch'): 11,
+    ('movies_detail', 'delete'): 10,
+    ('platform', 'get'): 2,
+    ('platform', 'post'): 4,
+    ('platform_detail', 'get'): 2,
+    ('platform_movies', 'get'): 1,
+    ('platform_detail', 'patch'): 5,
+    ('platform_detail', 'delete'): 14,
+    ('reviews', 'post'): 14,
+    ('reviews_batch', 'post'): 16,
+    ('reviews_detail', 'patch'): 12,
+    ('reviews_detail', 'delete'): 10,
+    ('movie_review', 'get'): 1,
+    ('movie_review_stats', 'get'): 1,
+    ('review_stats_batch', 'get'): 1,
+    ('movie_similar', 'get'): 2,
+    ('leaderboard_top', 'get'): 2,
+    ('leaderboard_trending', 'get'): 2,
+    ('movie_genre', 'get'): 1,
+    ('movie_genre', 'post'): 2,
+    ('movie_genre_details', 'get'): 1,
+    ('movie_genre_details', 'patch'): 3,
+    ('movie_genre_details', 'delete'): 4,
+    ('register', 'post'): 6,
+    ('verify', 'post'): 1,
+    ('verify_resend', 'post'): 4,
+    ('login', 'post'): 2,
+    ('logout', 'post'): 2,
+    ('add_to_watchlist', 'post'): 10,
+    ('view_watchlist', 'get'): 3,
+    ('delete_watchlist', 'delete'): 8,
+    ('bulk_add_to_watchlist', 'post'): 8,
+    ('async_movies', 'get'): 2,
+    ('async_movies_detail', 'get'): 2,
+    ('async_movie_review', 'get'): 1,
+    ('async_view_watchlist', 'get'): 3,
+    ('bulk_delete_watchlist', 'post'): 7,
+}
+
+
+class QueryBudgetTests(APITestCase):
+    ROWS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email='admin@example.com', password='Admin@1234', first_name='Ad', last_name='Min',
+            age=30, gender='others', address='Somewhere', phone='9800000000', is_email_verified=True,
+        )
+        cls.user = User.objects.create_user(
+            email='user@example.com', password='User@1234', first_name='Us', last_name='Er',
+            age=25, gender='female', address='Somewhere', phone='9800000001', is_email_verified=True,
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.genres = [MovieGenre.objects.create(name=f'Genre {i}') for i in range(cls.ROWS)]
+        cls.platforms = [Platform.objects.create(name=f'Platform {i}', url=f'https://platform{i}.example.com') for i in range(cls.ROWS)]
+        cls.movies = []
+        for i in range(cls.ROWS):
+            movie = Movies.objects.create(
+                title=f'Movie {i}', description='A movie.', release_year='2020-01-01',
+                platform=cls.platforms[i % 2], link=f'https://movies.example.com/{i}',
+            )
+            movie.genre.set(cls.genres[:3])
+            cls.movies.append(movie)
+            for j in range(cls.ROWS):
+                Reviews.objects.create(
+                    email=f'reviewer{j}@example.com', full_name='Reviewer', movie=movie,
+                    ratings=j + 1, comment='Nice.',
+                )
+                Movies.apply_review_delta(movie.pk, 1, j + 1)
+            if i:
+                Watchlist.objects.create(user=cls.user, movie=movie)
+
+    def setUp(self):
+        # Version bumps run on commit, which never happens inside a TestCase
+        cache.clear()
+
+    def assertWithinBudget(self, name, method, *args, data=None, user=None):
+        budget = QUERY_BUDGETS[(name, method)]
+        if user is not None:
+            self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(reverse(name, args=args), data, format='json')
+        self.assertLess(response.status_code, 500, response.content)
+        self.assertLessEqual(
+            len(queries), budget,
+            f'{method.upper()} {name} ran {len(queries)} queries (budget {budget}):\n'
+            + '\n'.join(q['sql'] for q in queries.captured_queries),
+        )
+        return response
+
+    def movie_payload(self, i):
+        return {
+            'title': f'New Movie {i}', 'description': 'New.', 'release_year': '2021-01-01',
+            'genre': [g.pk for g in self.genres], 'active': True,
+            'link': f'https://new.example.com/{i}', 'platform': self.platforms[0].pk,
+        }
+
+    def test_movie_endpoints(self):
+        movie = self.movies[0]
+        self.assertWithinBudget('movies', 'get', user=self.admin)
+        self.assertWithinBudget('movies', 'post', data=self.movie_payload(1), user=self.admin)
+        self.assertWithinBudget('movies_detail', 'get', movie.pk, user=self.admin)
+        self.assertWithinBudget('movies_detail', 'put', movie.pk, data=self.movie_payload(2), user=self.admin)
+        self.assertWithinBudget('movies_detail', 'patch', movie.pk, data={'active': False}, user=self.admin)
+        self.assertWithinBudget('movies_detail', 'delete', movie.pk, user=self.admin)
+
+    def test_sparse_fieldsets(self):
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('movies'), {'fields': 'id,title'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('description', queries[0]['sql'])
+        self.assertNotIn('base_platform', queries[0]['sql'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('view_watchlist'), {'omit': 'genre,description,rating'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('genre', response.data['results'][0])
+        first = response.data['results'][0]
+        self.assertEqual(first['platform'], Movies.objects.get(pk=first['id']).platform.name)
+
+        # Writes always get the full representation
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(reverse('movies_detail', args=[self.movies[0].pk]) + '?fields=id', {'active': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('title', response.data)
+
+    def test_catalog_export(self):
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('movie_export'), HTTP_ACCEPT_ENCODING='gzip')
+            body = gzip.decompress(b''.join(response.streaming_content))
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], [movie.title for movie in self.movies])
+        self.assertEqual(rows[0]['genre'], ['Genre 0', 'Genre 1', 'Genre 2'])
+        self.assertLessEqual(len(queries), QUERY_BUDGETS[('movie_export', 'get')])
+        for refused in ('gzip;q=0', 'x-gzip-free', 'br'):
+            response = self.client.get(reverse('movie_export'), HTTP_ACCEPT_ENCODING=refused)
+            self.assertFalse(response.has_header('Content-Encoding'), refused)
+            self.assertEqual(len(b''.join(response.streaming_content).splitlines()), len(self.movies))
+
+    def test_catalog_import(self):
+        rows = ''.join(
+            f'Imported {i},New.,2021,true,https://imported.example.com/{i},Platform {i % 2},,Genre {i % 3}|Genre 9\n'
+            for i in range(self.ROWS * 4)
+        )
+        upload = SimpleUploadedFile('catalog.csv', ('title,description,release_year,active,link,platform,platform_url,genre\n' + rows).encode())
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('movie_import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((response.data['created'], response.data['skipped']), (self.ROWS * 4, 0))
+        self.assertLessEqual(len(queries), QUERY_BUDGETS[('movie_import', 'post')])
+        self.assertEqual(Movies.objects.get(title='Imported 1').genre.count(), 2)
+
+    def test_catalog_import_repeated_titles_and_links(self):
+        rows = [
+            {'title': 'Twin A', 'release_year': '2021', 'link': 'https://imported.example.com/twin', 'platform': 'Platform 0'},
+            {'title': 'Twin B', 'release_year': '2021', 'link': 'https://imported.example.com/twin', 'platform': 'Platform 0'},
+            {'title': 'Twin A', 'release_year': '2022', 'link': 'https://imported.example.com/again', 'platform': 'Platform 0'},
+            {'title': 'Single', 'release_year': '2021', 'link': 'https://imported.example.com/single', 'platform': 'Platform 0'},
+        ]
+        report = CatalogImporter().run(rows)
+        self.assertEqual((report['rows'], report['created'], report['updated'], report['skipped']), (4, 2, 0, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [3, 2])
+        self.assertEqual(Movies.objects.get(link='https://imported.example.com/twin').title, 'Twin A')
+
+    def test_catalog_import_bad_lines_and_encoding(self):
+        lines = [
+            json.dumps({'title': 'Good', 'release_year': '2021', 'link': 'https://imported.example.com/good', 'platform': 'Platform 0'}),
+            '{"title": "Broken",',
+        ]
+        self.client.force_authenticate(self.admin)
+        upload = SimpleUploadedFile('catalog.jsonl', '\n'.join(lines).encode())
+        response = self.client.post(reverse('movie_import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((response.data['created'], response.data['skipped']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertIn('Invalid JSON', response.data['errors'][0]['error'])
+
+        upload = SimpleUploadedFile('catalog.jsonl', b'{"title": "Caf\xe9"}\n')
+        response = self.client.post(reverse('movie_import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.data['file'][0])
+
+    def test_platform_endpoints(self):
+        platform = self.platforms[0]
+        self.assertWithinBudget('platform', 'get', user=self.admin)
+        self.assertWithinBudget('platform', 'post', data={'name': 'New', 'url': 'https://new.example.com'}, user=self.admin)
+        self.assertWithinBudget('platform_detail', 'get', platform.pk, user=self.admin)
+        response = self.assertWithinBudget('platform_movies', 'get', platform.pk, user=self.admin)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertWithinBudget('platform_detail', 'patch', platform.pk, data={'name': 'Renamed'}, user=self.admin)
+        self.assertWithinBudget('platform_detail', 'delete', platform.pk, user=self.admin)
+
+    def test_review_endpoints(self):
+        movie = self.movies[0]
+        review = movie.reviews.first()
+        self.assertWithinBudget('movie_review', 'get', movie.pk, user=self.admin)
+        self.assertWithinBudget('reviews', 'post', data={
+            'movie': movie.pk, 'email': 'new@example.com', 'full_name': 'New', 'ratings': 7, 'comment': 'Good.',
+        }, user=self.admin)
+        response = self.assertWithinBudget('reviews_batch', 'post', data=[
+            {'movie': self.movies[i % 2].pk, 'email': f'batch{i}@example.com', 'full_name': 'Batch', 'ratings': 8, 'comment': 'Good.'}
+            for i in range(self.ROWS * 2)
+        ] + [{'movie': 0, 'email': 'bad@example.com', 'full_name': 'Bad', 'ratings': 11, 'comment': 'Bad.'}], user=self.admin)
+        self.assertEqual(len(response.data['created']), self.ROWS * 2)
+        self.assertEqual(response.data['errors'][0]['index'], self.ROWS * 2)
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'movie', 'ratings'})
+        self.assertEqual(Movies.objects.get(pk=self.movies[1].pk).review_count, self.ROWS * 2)
+        self.assertWithinBudget('reviews_detail', 'patch', review.pk, data={'ratings': 9}, user=self.admin)
+        self.assertWithinBudget('reviews_detail', 'delete', review.pk, user=self.admin)
+
+    def test_review_stats(self):
+        movie = self.movies[0]
+        response = self.assertWithinBudget('movie_review_stats', 'get', movie.pk, user=self.admin)
+        self.assertEqual((response.data['count'], response.data['mean'], response.data['rating']), (self.ROWS, 3, 6.5))
+        self.assertEqual(response.data['distribution'], {str(b): int(b <= self.ROWS) for b in range(1, 11)})
+        self.assertEqual(response.data['latest'], movie.reviews.latest('added_date').added_date)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('movie_review_stats', args=[movie.pk]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('reviews'), {
+                'movie': movie.pk, 'email': 'new@example.com', 'full_name': 'New', 'ratings': 9.5, 'comment': 'Good.',
+            }, format='json')
+        ids = ','.join(str(m.pk) for m in self.movies[:2]) + ',0'
+        response = self.assertWithinBudget('review_stats_batch', 'get', data={'ids': ids})
+        self.assertEqual([row['count'] for row in response.data], [self.ROWS + 1, self.ROWS, 0])
+        self.assertEqual(response.data[0]['distribution']['9'], 1)
+        self.assertEqual(response.data[0]['rating'], Movies.objects.get(pk=movie.pk).rating)
+        self.assertEqual(self.client.get(reverse('review_stats_batch'), {'ids': 'x'}).status_code, 400)
+
+    def test_leaderboard_endpoints(self):
+        call_command('rebuild_leaderboards', stdout=StringIO())
+        response = self.assertWithinBudget('leaderboard_top', 'get', user=self.admin)
+        self.assertEqual(len(response.data['results']), self.ROWS)
+        self.assertEqual(response.data['results'][0]['rank'], 1)
+        self.client.post(reverse('reviews'), {
+            'movie': self.movies[3].pk, 'email': 'fan@example.com', 'full_name': 'Fan', 'ratings': 10, 'comment': 'Best.',
+        }, format='json')
+        cache.clear()
+        response = self.client.get(reverse('leaderboard_top'), {'genre': self.genres[0].pk})
+        self.assertEqual(response.data['results'][0]['id'], self.movies[3].pk)
+        response = self.assertWithinBudget('leaderboard_trending', 'get', user=self.admin)
+        self.assertEqual(response.data['results'][0]['id'], self.movies[3].pk)
+        Movies.objects.filter(pk=self.movies[3].pk).update(active=False)
+        Movies.objects.get(pk=self.movies[3].pk).save()
+        self.assertFalse(LeaderboardEntry.objects.filter(movie=self.movies[3]).exclude(board='trending').exists())
+        cache.clear()
+        response = self.client.get(reverse('leaderboard_top'), {'platform': self.platforms[1].pk, 'limit': 1})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertNotEqual(response.data['results'][0]['id'], self.movies[3].pk)
+
+    def test_similar_movies_404_for_a_missing_movie(self):
+        missing = Movies.objects.order_by('-pk').first().pk + 1
+        self.assertEqual(self.client.get(reverse('movie_similar', args=[missing])).status_code, 404)
+        # A movie without neighbours is still there
+        self.assertEqual(self.client.get(reverse('movie_similar', args=[self.movies[0].pk])).status_code, 200)
+
+    def test_review_stats_404_for_a_missing_movie(self):
+        missing = Movies.objects.order_by('-pk').first().pk + 1
+        self.assertEqual(self.client.get(reverse('movie_review_stats', args=[missing])).status_code, 404)
+        # A movie without reviews is still there
+        Reviews.objects.filter(movie=self.movies[0]).delete()
+        response = self.client.get(reverse('movie_review_stats', args=[self.movies[0].pk]))
+        self.assertEqual((response.status_code, response.data['count']), (200, 0))
+
+    @override_settings(TRENDING_HALF_LIFE_DAYS=1)
+    def test_trending_scores_far_in_the_future(self):
+        # 10 ** 4 half-lives past EPOCH; 2 ** that would overflow a float
+        later = leaderboards.EPOCH + datetime.timedelta(days=10 ** 4)
+        popular, quiet = self.movies[0].pk, self.movies[1].pk
+        leaderboards.bump_trending({popular: 2, quiet: 1}, when=later)
+        leaderboards.bump_trending({popular: 1}, when=later + datetime.timedelta(days=1))
+        scores = dict(LeaderboardEntry.objects.filter(board='trending').values_list('movie_id', 'score'))
+        # 2 + 2 reviews in today's units, against 1
+        self.assertAlmostEqual(scores[popular] - scores[quiet], 2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.client.post(reverse('reviews'), {
+                'movie': quiet, 'email': 'fan@example.com', 'full_name': 'Fan', 'ratings': 10, 'comment': 'Best.',
+            }, format='json', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertAlmostEqual(LeaderboardEntry.objects.get(board='trending', movie_id=quiet).score, scores[quiet] + 1)
+
+    @skipUnless(scipy, 'build_similar_movies needs numpy and scipy')
+    def test_similar_movies(self):
+        other = User.objects.create_user(
+            email='other@example.com', password='Other@1234', first_name='Ot', last_name='Her',
+            age=25, gender='male', address='Somewhere', phone='9800000009',
+        )
+        for movie in self.movies[1:3]:
+            Watchlist.objects.create(user=other, movie=movie)
+        call_command('build_similar_movies', '--full', stdout=StringIO())
+        response = self.assertWithinBudget('movie_similar', 'get', self.movies[1].pk, user=self.admin)
+        self.assertEqual([movie['id'] for movie in response.data['results']][:1], [self.movies[2].pk])
+        self.assertAlmostEqual(response.data['results'][0]['score'], 1.0, places=5)
+        self.assertFalse(SimilarMovie.objects.filter(movie=self.movies[0]).exists())
+
+        # Only the queued movie and its neighbours are recomputed
+        self.client.force_authenticate(other)
+        self.client.post(reverse('add_to_watchlist', args=[self.movies[0].pk]))
+        self.assertTrue(PendingSimilarity.objects.filter(movie=self.movies[0]).exists())
+        call_command('build_similar_movies', stdout=StringIO())
+        self.assertFalse(PendingSimilarity.objects.exists())
+        self.assertEqual(
+            set(SimilarMovie.objects.filter(movie=self.movies[0]).values_list('similar_id', flat=True)),
+            {self.movies[1].pk, self.movies[2].pk},
+        )
+        self.assertTrue(SimilarMovie.objects.filter(movie=self.movies[1], similar=self.movies[0]).exists())
+
+    def test_genre_endpoints(self):
+        genre = self.genres[0]
+        self.assertWithinBudget('movie_genre', 'get', user=self.admin)
+        self.assertWithinBudget('movie_genre', 'post', data={'name': 'New Genre'}, user=self.admin)
+        self.assertWithinBudget('movie_genre_details', 'get', genre.pk, user=self.admin)
+        self.assertWithinBudget('movie_genre_details', 'patch', genre.pk, data={'name': 'Renamed'}, user=self.admin)
+        self.assertWithinBudget('movie_genre_details', 'delete', genre.pk, user=self.admin)
+
+    def test_account_endpoints(self):
+        self.assertWithinBudget('register', 'post', data={
+            'email': 'new@example.com', 'password': 'New@12345', 'first_name': 'Ne', 'last_name': 'W',
+            'age': 20, 'gender': 'male', 'address': 'Somewhere', 'phone': '9800000002',
+        })
+        self.assertWithinBudget('verify_resend', 'post', data={'email': 'new@example.com'})
+        otp = re.search(r'\d{6}', OutboxEmail.objects.filter(recipients=['new@example.com']).latest('id').message).group()
+        self.assertWithinBudget('verify', 'post', data={'email': 'new@example.com', 'otp': otp})
+        self.assertTrue(User.objects.get(email='new@example.com').is_email_verified)
+        response = self.assertWithinBudget('login', 'post', data={'email': 'user@example.com', 'password': 'User@1234'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        self.assertWithinBudget('logout', 'post')
+
+    def test_async_endpoints(self):
+        movie = self.movies[0]
+        response = self.assertWithinBudget('async_movies', 'get', data={'page_size': 2})
+        self.assertEqual(len(response.json()['results']), 2)
+        next_page = self.client.get(response.json()['next'])
+        self.assertEqual(len(next_page.json()['results']), 2)
+        filtered = self.client.get(reverse('async_movies'), {'platform': movie.platform_id})
+        self.assertEqual({row['platform'] for row in filtered.json()['results']}, {movie.platform.name})
+        self.assertEqual(self.client.get(reverse('async_movies'), {'platform': 'abc'}).status_code, 400)
+        # Invalid sizes fall back to the default, as on the sync list
+        for size in ('0', '-3', 'abc'):
+            response = self.client.get(reverse('async_movies'), {'page_size': size})
+            self.assertEqual(response.status_code, 200, size)
+            self.assertEqual(len(response.json()['results']), self.ROWS, size)
+        self.assertWithinBudget('async_movies_detail', 'get', movie.pk)
+        response = self.assertWithinBudget('async_movie_review', 'get', movie.pk)
+        self.assertEqual(len(response.json()['results']), self.ROWS)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = self.assertWithinBudget('async_view_watchlist', 'get')
+        self.assertEqual(len(response.json()['results']), self.ROWS - 1)
+        # Logout revokes the token for the async routes too
+        self.token.delete()
+        self.assertEqual(self.client.get(reverse('async_view_watchlist')).status_code, 401)
+
+    def test_watchlist_endpoints(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertWithinBudget('add_to_watchlist', 'post', self.movies[0].pk)
+        self.assertWithinBudget('view_watchlist', 'get')
+        self.assertWithinBudget('delete_watchlist', 'delete', self.movies[0].pk)
+        ids = [movie.pk for movie in self.movies]
+        response = self.assertWithinBudget('bulk_add_to_watchlist', 'post', data={'movies': ids + [0]})
+        self.assertEqual((len(response.data['added']), response.data['not_found']), (1, [0]))
+        response = self.assertWithinBudget('bulk_delete_watchlist', 'post', data={'movies': ids})
+        self.assertEqual(len(response.data['removed']), self.ROWS)
+        self.assertFalse(Watchlist.objects.filter(user=self.user).exists())
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.platform = Platform.objects.create(name='Platform', url='https://platform.example.com')
+
+    def test_etag_match_returns_304_until_a_write(self):
+        first = self.client.get(reverse('platform'))
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse('platform'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Platform.objects.create(name='Other', url='https://other.example.com')
+        fresh = self.client.get(reverse('platform'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(len(fresh.data), 2)
+
+
+class CursorPaginationTests(APITestCase):
+    ROWS = 105  # over max_page_size
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', password='User@1234', first_name='Us', last_name='Er',
+            age=25, gender='female', address='Somewhere', phone='9800000001', is_email_verified=True,
+        )
+        platform = Platform.objects.create(name='Platform', url='https://platform.example.com')
+        Movies.objects.bulk_create([
+            Movies(title=f'Movie {i}', description='A movie.', release_year='2020-01-01', platform=platform, link=f'https://movies.example.com/{i}')
+            for i in range(cls.ROWS)
+        ])
+        cls.movies = list(Movies.objects.order_by('pk'))
+        Reviews.objects.bulk_create([
+            Reviews(email=f'reviewer{i}@example.com', full_name='Reviewer', movie=cls.movies[0], ratings=5, comment='Fine.')
+            for i in range(cls.ROWS)
+        ])
+        # Watchlist ids run opposite to movie ids, so the tie-break must use the former
+        Watchlist.objects.bulk_create([Watchlist(user=cls.user, movie=movie) for movie in reversed(cls.movies)])
+        # Equal timestamps everywhere: only the id tie-break orders the rows
+        moment = timezone.now()
+        Movies.objects.update(added_date=moment)
+        Reviews.objects.update(added_date=moment)
+        Watchlist.objects.update(added_on=moment)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url, page_size):
+        seen = []
+        while url:
+            response = self.client.get(url, {'page_size': page_size} if '?' not in url else None)
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            seen += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        return seen
+
+    def test_movies(self):
+        self.assertEqual(self.walk(reverse('movies'), 7), [movie.pk for movie in reversed(self.movies)])
+
+    def test_movie_reviews(self):
+        expected = list(Reviews.objects.order_by('-id').values_list('pk', flat=True))
+        self.assertEqual(self.walk(reverse('movie_review', args=[self.movies[0].pk]), 7), expected)
+
+    def test_watchlist(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.walk(reverse('view_watchlist'), 7), [movie.pk for movie in self.movies])
+
+    def test_page_size_is_capped(self):
+        self.client.force_authenticate(self.user)
+        for url in (reverse('movies'), reverse('movie_review', args=[self.movies[0].pk]), reverse('view_watchlist')):
+            self.assertEqual(len(self.client.get(url, {'page_size': 1000}).data['results']), 100)
+
+
+class RankedSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.netflix = Platform.objects.create(name='Netflix', url='https://netflix.example.com')
+        self.hulu = Platform.objects.create(name='Hulu', url='https://hulu.example.com')
+        self.movies = {
+            title: self.create(title, description, platform, active)
+            for title, description, platform, active in [
+                ('Crimson Tide', 'A submarine standoff.', self.netflix, True),
+                ('Crimson River', 'Murders in the Alps.', self.hulu, True),
+                ('Blue Lagoon', 'Castaways under a crimson sunset.', self.netflix, True),
+                ('Crimson Peak', 'A gothic romance.', self.netflix, False),
+            ]
+        }
+
+    def create(self, title, description, platform, active=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Movies.objects.create(
+                title=title, description=description, release_year='2020-01-01', active=active,
+                platform=platform, link=f'https://movies.example.com/{title.replace(" ", "-")}',
+            )
+
+    def search(self, **params):
+        response = self.client.get(reverse('movies'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['title'] for row in response.data['results']]
+
+    def test_title_hits_rank_above_description_hits(self):
+        titles = self.search(q='crimson')
+        self.assertEqual(set(titles[:3]), {'Crimson Tide', 'Crimson River', 'Crimson Peak'})
+        self.assertEqual(titles[3], 'Blue Lagoon')
+
+    def test_filters_apply_to_ranked_results(self):
+        self.assertEqual(self.search(q='crimson', platform=self.netflix.pk, active='true'), ['Crimson Tide', 'Blue Lagoon'])
+
+    def test_pages_through_every_match(self):
+        url, seen = reverse('movies') + '?q=crimson&page_size=1', []
+        while url:
+            response = self.client.get(url)
+            seen += [row['title'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, self.search(q='crimson'))
+        self.assertEqual(self.client.get(reverse('movies'), {'q': 'crimson', 'offset': 'x'}).status_code, 400)
+
+    def test_index_follows_writes(self):
+        movie = self.create('Zephyr', 'Wind.', self.hulu)
+        self.assertEqual(self.search(q='zephyr'), ['Zephyr'])
+        with self.captureOnCommitCallbacks(execute=True):
+            movie.title = 'Quasar'
+            movie.save()
+        self.assertEqual((self.search(q='zephyr'), self.search(q='quasar')), ([], ['Quasar']))
+        with self.captureOnCommitCallbacks(execute=True):
+            movie.delete()
+        self.assertEqual(self.search(q='quasar'), [])
+
+    def test_icontains_fallback_without_an_index(self):
+        with mock.patch('base.views.search_movies', return_value=None):
+            self.assertEqual(self.search(q='rims'), ['Crimson Peak', 'Crimson River', 'Crimson Tide'])
+            self.assertEqual(self.search(q='rims', page_size=2, offset=2), ['Crimson Tide'])
+
+
+@modify_settings(MIDDLEWARE={'prepend': 'base.compression.CompressionMiddleware'})
+@override_settings(RESPONSE_COMPRESSION_MIN_BYTES=200)
+class ResponseFormatTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        platform = Platform.objects.create(name='Platform', url='https://platform.example.com')
+        self.movie = Movies.objects.create(
+            title='Movie', description='A movie.', release_year='2020-01-01',
+            platform=platform, link='https://movies.example.com/1',
+        )
+        for i in range(10):
+            Reviews.objects.create(movie=self.movie, email=f'r{i}@example.com', full_name='Reviewer', ratings=7, comment='Good.')
+
+    def test_negotiate(self):
+        self.assertIsNone(negotiate(''))
+        self.assertIsNone(negotiate('identity'))
+        self.assertEqual(negotiate('gzip'), 'gzip')
+        self.assertEqual(negotiate('gzip;q=0, deflate'), None)
+        self.assertIn(negotiate('*'), ('br', 'gzip'))
+        self.assertEqual(negotiate('br;q=0.5, gzip'), 'gzip')
+        self.assertEqual(negotiate('br', offered=['gzip']), None)
+
+    def test_compressed_above_threshold(self):
+        response = self.client.get(reverse('movie_review', args=[self.movie.pk]), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['results']), 10)
+
+        plain = self.client.get(reverse('movie_review', args=[self.movie.pk]))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        with override_settings(RESPONSE_COMPRESSION_MIN_BYTES=10 ** 6):
+            small = self.client.get(reverse('movie_review', args=[self.movie.pk]), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_weak_etag_still_matches(self):
+        first = self.client.get(reverse('movies'), {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        cached = self.client.get(reverse('movies'), {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_msgpack_round_trip(self):
+        response = self.client.get(reverse('movie_review', args=[self.movie.pk]), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        body = msgpack.unpackb(response.content)
+        self.assertEqual(body['results'], json.loads(json.dumps(response.data['results'])))
+
+        user = User.objects.create_user(
+            email='writer@example.com', password='Writer@1234', first_name='Wr', last_name='Iter',
+            age=30, gender='male', address='Somewhere', phone='9811111111', is_email_verified=True,
+        )
+        self.client.force_authenticate(user)
+        payload = {'movie': self.movie.pk, 'email': 'writer@example.com', 'full_name': 'Writer', 'ratings': 9, 'comment': 'Packed.'}
+        created = self.client.post(reverse('reviews'), msgpack.packb(payload), content_type='application/msgpack', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(msgpack.unpackb(created.content)['comment'], 'Packed.')
+        broken = self.client.post(reverse('reviews'), b'\xc1', content_type='application/msgpack')
+        self.assertEqual(broken.status_code, 400)
+
+
+@modify_settings(MIDDLEWARE={'prepend': 'base.instrumentation.RequestMetricsMiddleware'})
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        platform = Platform.objects.create(name='Platform', url='https://platform.example.com')
+        self.movies = [
+            Movies.objects.create(
+                title=f'Movie {i}', description='A movie.', release_year='2020-01-01',
+                platform=platform, link=f'https://movies.example.com/{i}',
+            )
+            for i in range(3)
+        ]
+
+    def test_server_timing_and_log(self):
+        with self.assertLogs('base.instrumentation', 'INFO') as logs:
+            response = self.client.get(reverse('movies'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="2 queries", serializer;dur=[\d.]+, view;dur=[\d.]+, total;dur=[\d.]+$')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['route'], record['status'], record['queries']), ('movies', 200, 2))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        self.assertFalse(self.client.get(reverse('movies')).has_header('Server-Timing'))
+
+    @override_settings(N_PLUS_ONE_THRESHOLD=3)
+    def test_repeated_query_shapes_are_flagged(self):
+        with collect() as metrics:
+            MovieSerializer(Movies.objects.select_related('platform'), many=True).data
+        (shape, count), = metrics.suspected_n_plus_one()
+        # Without prefetch_related('genre') both the genre field and the name override query per movie
+        self.assertEqual(count, 2 * len(self.movies))
+        self.assertIn('base_moviegenre', shape)
+        self.assertGreater(metrics.serializer_seconds, 0)
+
+
+# Outside TestCase's wrapping transaction, which would keep every read on the primary
+@override_settings(DATABASE_REPLICAS={'replica_a': 3, 'replica_b': 1}, REPLICA_LAG_SECONDS=30)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route(self, request, write=False):
+        seen = {}
+
+        def view(request):
+            if write:
+                seen['write'] = self.router.db_for_write(Movies)
+            seen['read'] = self.router.db_for_read(Movies)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen, response
+
+    def test_safe_requests_read_from_a_weighted_replica(self):
+        with mock.patch('base.routers.random.choices', return_value=['replica_b']) as choices:
+            seen, _ = self.route(self.factory.get('/movies/'))
+        self.assertEqual(seen['read'], 'replica_b')
+        self.assertEqual(choices.call_args.kwargs['weights'], [3, 1])
+        self.assertEqual(self.router.db_for_read(Movies), 'default')  # outside a request
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        seen, response = self.route(self.factory.post('/reviews/', HTTP_AUTHORIZATION='Token abc'), write=True)
+        self.assertEqual(seen, {'write': 'default', 'read': 'default'})
+        # The same token reads from the primary until the lag window passes
+        seen, _ = self.route(self.factory.get('/movies/', HTTP_AUTHORIZATION='Token abc'))
+        self.assertEqual(seen['read'], 'default')
+        seen, _ = self.route(self.factory.get('/movies/', HTTP_AUTHORIZATION='Token other'))
+        self.assertIn(seen['read'], ('replica_a', 'replica_b'))
+        # Clients without a token are pinned by cookie
+        request = self.factory.get('/movies/')
+        request.COOKIES['primary_until'] = response.cookies['primary_until'].value
+        self.assertEqual(self.route(request)[0]['read'], 'default')
+
+    def test_write_inside_a_safe_request_moves_later_reads_to_the_primary(self):
+        seen, response = self.route(self.factory.get('/movies/'), write=True)
+        self.assertEqual(seen['read'], 'default')
+        self.assertIn('primary_until', response.cookies)
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out, stderr=StringIO())
+        self.assertIn('served from an index', out.getvalue())
+
+    def test_full_scan_detection(self):
+        self.assertEqual(full_scans('2 0 0 SCAN base_reviews', 'sqlite'), ['base_reviews'])
+        self.assertEqual(full_scans('2 0 0 SCAN base_reviews USING INDEX reviews_email_added_idx', 'sqlite'), [])
+        self.assertEqual(full_scans('2 0 0 SCAN CONSTANT ROW', 'sqlite'), [])
+        self.assertEqual(full_scans('Seq Scan on base_reviews  (cost=0.00..1.05 rows=1 width=8)', 'postgresql'), ['base_reviews'])
+
+
+class EndpointBenchmarkTests(APITestCase):
+    def test_every_route_is_benchmarked(self):
+        self.assertEqual(unbenchmarked_routes(), [])
+
+    def test_benchmark_writes_comparable_json(self):
+        call_command(
+            'generate_synthetic_data', '--users', '5', '--movies', '20', '--reviews', '100', '--watchlist', '30',
+            stdout=StringIO(),
+        )
+        self.assertEqual((Movies.objects.count(), Reviews.objects.count(), Watchlist.objects.count()), (20, 100, 30))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'results.json')
+            call_command(
+                'benchmark_endpoints', '--requests', '2', '--warmup', '0', '--route', 'movies_detail', '--route', 'login',
+                '--output', path, stdout=StringIO(), stderr=StringIO(),
+            )
+            with open(path) as f:
+                results = json.load(f)
+        self.assertEqual(set(results['routes']), {'GET movies_detail', 'PUT movies_detail', 'PATCH movies_detail', 'DELETE movies_detail', 'POST login'})
+        self.assertEqual(results['routes']['POST login']['status'], [200])
+        self.assertEqual(results['meta']['dataset']['reviews'], 100)
+        # Writes are rolled back after every request
+        self.assertEqual(Movies.objects.count(), 20)
+
+        slower = json.loads(json.dumps(results))
+        slower['routes']['POST login']['queries'] += 1
+        self.assertEqual(compare(results, slower), [f"POST login: queries {results['routes']['POST login']['queries']} -> {slower['routes']['POST login']['queries']}"])
+        self.assertEqual(compare(results, results), [])
+
+
+@override_settings(THROTTLE_BUCKETS={'login': {'ip': (100, 1), 'email': (3, 0.5)}})
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_email_bucket_refuses_with_retry_after(self):
+        data = {'email': 'someone@example.com', 'password': 'Wrong@1234'}
+        # A frozen clock: the password hashing must not refill the bucket
+        with mock.patch('base.throttling.time') as clock:
+            clock.time.return_value = 1_000_000.0
+            for _ in range(3):
+                self.assertEqual(self.client.post(reverse('login'), data).status_code, 404)
+            with self.assertNumQueries(0):
+                response = self.client.post(reverse('login'), data)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '2')
+        # Other emails from the same IP still get through
+        self.assertEqual(self.client.post(reverse('login'), dict(data, email='other@example.com')).status_code, 404)
+
+    def test_falls_back_to_local_buckets_without_the_cache(self):
+        data = {'email': 'local@example.com', 'password': 'Wrong@1234'}
+        with mock.patch('base.throttling.take_shared', side_effect=ConnectionError), self.assertLogs('base.throttling', 'WARNING'):
+            statuses = [self.client.post(reverse('login'), data).status_code for _ in range(4)]
+        self.assertEqual(statuses, [404, 404, 404, 429])
+
+
+class OTPStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def check_store(self):
+        store = get_otp_store()
+        code = store.issue('user@example.com')
+        self.assertEqual(store.verify('user@example.com', '000000' if code != '000000' else '111111'), INVALID)
+        self.assertEqual(store.verify('user@example.com', code), VERIFIED)
+        self.assertEqual(store.verify('user@example.com', code), EXPIRED)
+        code = store.issue('user@example.com')
+        wrong = '000000' if code != '000000' else '111111'
+        results = [store.verify('user@example.com', wrong) for _ in range(3)]
+        self.assertEqual(results, [INVALID, INVALID, LOCKED])
+        self.assertEqual(store.verify('user@example.com', code), EXPIRED)
+
+    @override_settings(OTP_STORE='cache', OTP_MAX_ATTEMPTS=3)
+    def test_cache_store(self):
+        self.check_store()
+
+    @override_settings(OTP_STORE='db', OTP_MAX_ATTEMPTS=3)
+    def test_database_store_and_sweeper(self):
+        self.check_store()
+        get_otp_store().issue('late@example.com')
+        EmailOTP.objects.update(expires_at=timezone.now())
+        self.assertEqual(get_otp_store().verify('late@example.com', '123456'), EXPIRED)
+        call_command('sweep_otps', stdout=StringIO())
+        self.assertFalse(EmailOTP.objects.exists())
+
+    @override_settings(OTP_STORE='cache', OTP_MAX_ATTEMPTS=3)
+    def test_cache_outage_falls_back_to_the_database(self):
+        store = get_otp_store()
+        with mock.patch.object(store.cache, 'set_many', side_effect=ConnectionError), self.assertLogs('base.otp', 'WARNING'):
+            code = store.issue('user@example.com')
+        self.assertTrue(EmailOTP.objects.filter(email='user@example.com').exists())
+        with mock.patch.object(store.cache, 'get', side_effect=ConnectionError), self.assertLogs('base.otp', 'WARNING'):
+            self.assertEqual(store.verify('user@example.com', '000000' if code != '000000' else '111111'), INVALID)
+        # Back up: the code issued during the outage still verifies
+        self.assertEqual(store.verify('user@example.com', code), VERIFIED)
+        self.assertFalse(EmailOTP.objects.exists())
+
+    def test_verify_normalises_the_email_like_the_user_row(self):
+        user = User.objects.create_user(
+            email='Mixed@EXAMPLE.com', password='Mixed@1234', first_name='Mi', last_name='Xed',
+            age=25, gender='female', address='Somewhere', phone='9800000002',
+        )
+        code = get_otp_store().issue(user.email)
+        response = self.client.post(reverse('verify'), {'email': ' Mixed@example.COM', 'otp': code})
+        self.assertEqual(response.status_code, 200, response.content)
+        user.refresh_from_db()
+        self.assertTrue(user.is_email_verified)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxWorkerTests(TestCase):
+    def queue(self, count):
+        for i in range(count):
+            OutboxEmail.objects.create(subject=f'Subject {i}', message='Body', from_email='noreply@example.com', recipients=[f'user{i}@example.com'])
+
+    def test_delivers_queued_mail_in_batches(self):
+        self.queue(5)
+        call_command('send_queued_mail', batch_size=2, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 5)
+
+    def test_failed_mail_backs_off_then_dead_letters(self):
+        self.queue(1)
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=ConnectionError('refused')):
+            call_command('send_queued_mail', max_attempts=2, backoff=60, stdout=StringIO())
+            email = OutboxEmail.objects.get()
+            self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 1))
+            self.assertGreater(email.next_attempt_at, email.created_at)
+            OutboxEmail.objects.update(next_attempt_at=email.created_at)
+            call_command('send_queued_mail', max_attempts=2, backoff=60, stdout=StringIO())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.DEAD, 2))
+        self.assertIn('refused', email.last_error)
+
+    def test_connect_failure_backs_off_the_batch(self):
+        self.queue(3)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=OSError('connection refused')):
+            call_command('send_queued_mail', batch_size=2, backoff=60, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+        for email in OutboxEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 1))
+            self.assertIn('connection refused', email.last_error)
+            self.assertGreater(email.next_attempt_at, email.created_at)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        ttl = mock.patch.object(local_cache, 'ttl', 30)
+        ttl.start()
+        self.addCleanup(ttl.stop)
+        self.user = User.objects.create_user(
+            email='user@example.com', password='User@1234', first_name='Us', last_name='Er',
+            age=25, gender='female', address='Somewhere', phone='9800000001', is_email_verified=True,
+        )
+        self.key = Token.objects.create(user=self.user).key
+        self.auth = CachedTokenAuthentication()
+
+    def test_cached_token_skips_the_lookup(self):
+        self.auth.authenticate_credentials(self.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.key)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_deactivation_and_token_deletion_invalidate_the_cache(self):
+        self.auth.authenticate_credentials(self.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+        self.user.is_active = True
+        self.user.save()
+        self.auth.authenticate_credentials(self.key)
+        # LogoutView deletes the token the same way
+        self.user.auth_token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+
+    @override_settings(TOKEN_AUTH_CACHE_ALIAS='default')
+    def test_revocation_reaches_other_processes(self):
+        self.auth.authenticate_credentials(self.key)
+        # Another worker still holds the token in its local tier
+        entry = local_cache.get(self.key)
+        self.user.auth_token.delete()
+        local_cache.set(self.key, entry)
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+
+    @override_settings(TOKEN_AUTH_CACHE_ALIAS='default')
+    def test_bulk_deactivation_with_invalidate_user(self):
+        self.auth.authenticate_credentials(self.key)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        invalidate_user(self.user.pk)
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
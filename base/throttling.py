@@ -0,0 +1,134 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# Token-bucket throttles for the expensive anonymous endpoints (password
+# hashing in Login/register, OTP guessing in VerifyOTP, OTP mail in
+# ResendOTP). Each request draws one token from a bucket per client IP and
+# one per submitted email; either bucket running dry answers 429 with
+# Retry-After before any hashing runs.
+#
+# Buckets live in the Django cache named by THROTTLE_CACHE_ALIAS (default
+# 'default'; point it at Redis/Memcached so all workers share them) and are
+# updated with atomic incr/decr. If that cache is unreachable the process
+# falls back to its own in-memory buckets. Sizes are per endpoint:
+#
+#     THROTTLE_BUCKETS = {'login': {'ip': (20, 0.2), 'email': (5, 0.05)}}
+#
+# where each pair is (capacity, refill tokens per second).
+
+DEFAULT_BUCKETS = {
+    'login': {'ip': (20, 0.2), 'email': (5, 0.05)},
+    'register': {'ip': (5, 0.02), 'email': (3, 0.01)},
+    'verify': {'ip': (10, 0.1), 'email': (5, 0.02)},
+    'resend': {'ip': (5, 0.02), 'email': (3, 0.005)},
+}
+
+
+class LocalBuckets:
+    """Exact in-process token buckets, used when the shared cache is down."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return 0 if allowed else (1 - tokens) / rate
+
+
+local_buckets = LocalBuckets()
+
+
+def take_shared(cache, key, capacity, rate, now):
+    """Draw a token from a cache-backed bucket; return 0 or the seconds to wait.
+
+    The bucket is a start time plus an atomic counter of tokens taken since
+    then: `taken <= capacity + rate * elapsed` means a token was available.
+    Both keys expire once a full refill would have happened anyway.
+    """
+    ttl = math.ceil(capacity / rate) + 1
+    cache.add(f'{key}:start', now, ttl)
+    cache.add(f'{key}:taken', 0, ttl)
+    taken = cache.incr(f'{key}:taken')
+    start = cache.get(f'{key}:start', now)
+    cache.touch(f'{key}:start', ttl)
+    cache.touch(f'{key}:taken', ttl)
+
+    refilled = rate * (now - start)
+    if taken <= refilled:
+        # Idle long enough for the bucket to be full again: restart it
+        cache.set_many({f'{key}:start': now, f'{key}:taken': 1}, ttl)
+        return 0
+    if taken <= capacity + refilled:
+        return 0
+    cache.decr(f'{key}:taken')  # a refused request does not consume a token
+    return (taken - capacity - refilled) / rate
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_buckets(self):
+        buckets = dict(DEFAULT_BUCKETS.get(self.scope, {}))
+        buckets.update(getattr(settings, 'THROTTLE_BUCKETS', {}).get(self.scope, {}))
+        return buckets
+
+    def get_idents(self, request):
+        idents = {'ip': self.get_ident(request)}
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if isinstance(email, str) and email.strip():
+            idents['email'] = email.strip().lower()
+        return idents
+
+    def allow_request(self, request, view):
+        now = time.time()
+        buckets = self.get_buckets()
+        self.wait_seconds = 0
+        for kind, ident in self.get_idents(request).items():
+            if kind not in buckets:
+                continue
+            capacity, rate = buckets[kind]
+            key = f'throttle:{self.scope}:{kind}:{ident}'
+            try:
+                wait = take_shared(caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')], key, capacity, rate, now)
+            except Exception:
+                logger.warning('Throttle cache unavailable, using in-process buckets.', exc_info=True)
+                wait = local_buckets.take(key, capacity, rate, now)
+            self.wait_seconds = max(self.wait_seconds, wait)
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return math.ceil(self.wait_seconds)
+
+
+class LoginThrottle(TokenBucketThrottle):
+    scope = 'login'
+
+
+class RegisterThrottle(TokenBucketThrottle):
+    scope = 'register'
+
+
+class VerifyOTPThrottle(TokenBucketThrottle):
+    scope = 'verify'
+
+
+class ResendOTPThrottle(TokenBucketThrottle):
+    scope = 'resend'
@@ -1,24 +1,42 @@
 from django.contrib import admin
 from django.urls import path
 from .views import *
+from . import async_views
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
     path('movies/', MoviesApiViewSet.as_view({'get': 'list', 'post':'create'}), name='movies'),
+    path('movies/export/', MovieExportView.as_view(), name='movie_export'),
+    path('movies/import/', MovieImportView.as_view(), name='movie_import'),
     path('movies/<int:pk>/', MoviesApiViewSet.as_view({'get': 'retrieve', 'put':'update','patch': 'partial_update', 'delete':'destroy'}),name='movies_detail'),
     path('platform/', PlatformApiViewSet.as_view({'get': 'list', 'post':'create'}), name='platform'),
     path('platform/<int:pk>/', PlatformApiViewSet.as_view({'get':'retrieve','put':'update','patch':'partial_update','delete':'destroy'}), name='platform_detail'),
+    path('platform/<int:pk>/movies/', PlatformMoviesView.as_view(), name='platform_movies'),
     path('reviews/', ReviewsApiViewSet.as_view({'post':'create'}), name='reviews'),
+    path('reviews/batch/', ReviewsBatchView.as_view(), name='reviews_batch'),
     path('reviews/<int:pk>/', ReviewsApiViewSet.as_view({'put':'update','patch':'partial_update','delete':'destroy'}), name='reviews_detail'),
     path('movies/<int:pk>/reviews/', ReviewsApiViewSetDetails.as_view(), name='movie_review'),
+    path('movies/<int:pk>/reviews/stats/', movie_review_stats, name='movie_review_stats'),
+    path('movies/reviews/stats/', review_stats_batch, name='review_stats_batch'),
+    path('movies/<int:pk>/similar/', SimilarMoviesView.as_view(), name='movie_similar'),
+    path('leaderboards/top/', LeaderboardView.as_view(), name='leaderboard_top'),
+    path('leaderboards/trending/', LeaderboardView.as_view(trending=True), name='leaderboard_trending'),
     path('genre/', MovieGenreApiView.as_view({'get': 'list', 'post':'create'}), name='movie_genre'),
     path('genre/<int:pk>/', MovieGenreApiView.as_view({'get': 'retrieve', 'put':'update','patch': 'partial_update', 'delete':'destroy'}), name='movie_genre_details'),
     path('register/', register, name='register'),
     path('verify/', VerifyOTP.as_view(), name='verify'),
+    path('verify/resend/', ResendOTP.as_view(), name='verify_resend'),
     path('login/', Login, name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     # path('watchlist/', WatchlistViewSet.as_view(), name='watchlist'),
     path('add_to_watchlist/<int:pk>/', add_to_watchlist, name='add_to_watchlist'),
+    path('add_to_watchlist/bulk/', bulk_add_to_watchlist, name='bulk_add_to_watchlist'),
     path('view_watchlist/',view_watchlist, name='view_watchlist'),
     path('delete_watchlist/<int:pk>/',delete_watchlist, name='delete_watchlist'),
+    path('delete_watchlist/bulk/',bulk_delete_watchlist, name='bulk_delete_watchlist'),
+    # Async read paths for ASGI deployments
+    path('async/movies/', async_views.movie_list, name='async_movies'),
+    path('async/movies/<int:pk>/', async_views.movie_detail, name='async_movies_detail'),
+    path('async/movies/<int:pk>/reviews/', async_views.movie_reviews, name='async_movie_review'),
+    path('async/view_watchlist/', async_views.view_watchlist, name='async_view_watchlist'),
 ]
\ No newline at end of file
@@ -4,53 +4,339 @@ from .serializers import *
 from .models import *
 from rest_framework import generics
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 from rest_framework.views import APIView
+from rest_framework.utils.urls import replace_query_param
 from .emails import *
 from django.contrib.auth import authenticate
-from django.contrib.auth.hashers import make_password
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated
 from .validators import CustomPasswordValidator
 from rest_framework.authtoken.models import Token
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Prefetch
+from .pagination import *
+from .search import search_movies
+from .caching import CachedResponseMixin, bump_versions
+from .signals import RESPONSE_NAMESPACES
+from .importer import READERS, CatalogImporter, text_stream
+from .export import gzip_stream, iter_ndjson
+from .compression import negotiate
+from .throttling import LoginThrottle, RegisterThrottle, ResendOTPThrottle, VerifyOTPThrottle
+from .otp import EXPIRED, LOCKED, VERIFIED, get_otp_store, normalize_email
+from . import leaderboards, review_stats
+from .similarity import queue_movies, read_similar
+from .renderers import PARSER_CLASSES, RENDERER_CLASSES
+from django.http import Http404, StreamingHttpResponse
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from django.conf import settings
 # Create your views here.
 
-class MoviesApiViewSet(viewsets.ModelViewSet):
+def sparse_movie_queryset(queryset, fields):
+    # The serializer reads platform.name and every genre name; the rating is
+    # served from the stored aggregates. With ?fields=/?omit= only the needed
+    # columns are loaded and unused relations are neither joined nor prefetched.
+    if fields is None:
+        return queryset.select_related('platform').prefetch_related('genre')
+    if 'platform' in fields:
+        queryset = queryset.select_related('platform')
+    if 'genre' in fields:
+        queryset = queryset.prefetch_related('genre')
+    # The cursor paginators order on (added_date, id)
+    columns = {'id', 'added_date'}
+    for name in fields:
+        columns.update(MOVIE_FIELD_COLUMNS[name])
+    return queryset.only(*columns)
+
+class MoviesApiViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = MovieSerializer
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
     queryset = Movies.objects.all()
+    pagination_class = MovieCursorPagination
+    cache_namespace = 'movies'
     filterset_fields = ['platform','active']
     search_fields = ['title']
-    
-class MovieGenreApiView(viewsets.ModelViewSet):
+
+    def get_queryset(self):
+        return sparse_movie_queryset(super().get_queryset(), movie_fields(self.request))
+
+    def list(self, request, *args, **kwargs):
+        # ?q= switches to ranked full-text search; ?search= keeps the plain title filter
+        query = request.query_params.get('q')
+        if query is None:
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(self.ranked_search, request, query)
+
+    def ranked_search(self, request, query):
+        # Ranked results have no keyset to page on, so pages are offsets into
+        # the first MOVIE_SEARCH_CANDIDATES matches
+        limit = self.paginator.get_page_size(request)
+        try:
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            return Response({'offset': ['Must be a non-negative integer.']}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_queryset())
+        ids = search_movies(query, getattr(settings, 'MOVIE_SEARCH_CANDIDATES', 1000))
+        if ids is None:
+            # One extra row tells whether there is a next page
+            movies = list(queryset.filter(title__icontains=query).order_by('title', 'id')[offset:offset + limit + 1])
+            more, movies = len(movies) > limit, movies[:limit]
+        else:
+            # The filters (platform, active) still apply; keep the index's rank order
+            matched = set(queryset.filter(pk__in=ids).values_list('pk', flat=True))
+            ranked = [pk for pk in ids if pk in matched]
+            page = ranked[offset:offset + limit]
+            more = len(ranked) > offset + limit
+            by_id = queryset.in_bulk(page)
+            movies = [by_id[pk] for pk in page]
+        url = request.build_absolute_uri()
+        serializer = self.get_serializer(movies, many=True)
+        return Response({
+            'next': replace_query_param(url, 'offset', offset + limit) if more else None,
+            'previous': replace_query_param(url, 'offset', max(offset - limit, 0)) if offset else None,
+            'results': serializer.data,
+        })
+
+class MovieExportView(APIView):
+    # NDJSON stream of the full catalog; gzipped when the client accepts it
+    def get(self, request, format=None):
+        chunks = iter_ndjson(chunk_size=getattr(settings, 'CATALOG_EXPORT_CHUNK_SIZE', 2000))
+        gzipped = negotiate(request.headers.get('Accept-Encoding'), offered=['gzip']) == 'gzip'
+        response = StreamingHttpResponse(gzip_stream(chunks) if gzipped else chunks, content_type='application/x-ndjson')
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        response['Vary'] = 'Accept-Encoding'
+        response['Content-Disposition'] = 'attachment; filename="catalog.ndjson"'
+        return response
+
+class MovieImportView(APIView):
+    # Bulk load a CSV/JSONL catalog file, see base/importer.py for the columns
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, format=None):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if fmt not in READERS:
+            return Response({'format': [f"Must be one of: {', '.join(sorted(READERS))}."]}, status=status.HTTP_400_BAD_REQUEST)
+        importer = CatalogImporter()
+        try:
+            report = importer.run(READERS[fmt](text_stream(upload)))
+        except UnicodeDecodeError:
+            return Response(
+                {'file': [f"Not valid UTF-8 text; the first {importer.stats['rows']} rows were imported."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(report, status=status.HTTP_200_OK)
+
+class MovieGenreApiView(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = MovieGenreSerializer
     queryset = MovieGenre.objects.all()
+    cache_namespace = 'genre'
 
-class PlatformApiViewSet(viewsets.ModelViewSet):
+class PlatformApiViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     serializer_class = PlatformSerializer
     queryset = Platform.objects.all()
+    cache_namespace = 'platform'
     filterset_fields = ['name']
     search_fields = ['name']
+
+    def get_queryset(self):
+        # One grouped COUNT query, plus one windowed query fetching at most
+        # PLATFORM_MOVIE_TITLES titles per platform
+        queryset = Platform.objects.annotate(movie_count=Count('movies'))
+        if self.request.query_params.get('movies') != 'count':
+            sample = Movies.objects.only('id', 'title', 'platform_id').order_by('title')[:PLATFORM_MOVIE_TITLES]
+            queryset = queryset.prefetch_related(Prefetch('movies', queryset=sample, to_attr='movie_sample'))
+        return queryset
+
+    def perform_create(self, serializer):
+        platform = serializer.save()
+        # A new platform has no movies yet, so there is nothing to count
+        platform.movie_count, platform.movie_sample = 0, []
+
+class PlatformMoviesView(generics.ListAPIView):
+    serializer_class = PlatformMovieSerializer
+    pagination_class = MovieCursorPagination
+
+    def get_queryset(self):
+        return Movies.objects.filter(platform_id=self.kwargs['pk']).only(*PlatformMovieSerializer.Meta.fields)
     
 class ReviewsApiViewSet(viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
     queryset = Reviews.objects.all()
     # send_email_for_review_added(serializer_class.data['email','movie.title','ratings'])
     def perform_create(self, serializer):
-        review = serializer.save()  # Save the review and get the instance
-        # Send email after review is successfully created
-        send_email_for_review_added(review.email, review.movie.title, review.ratings)
+        with transaction.atomic():
+            review = serializer.save()  # Save the review and get the instance
+            Movies.apply_review_delta(review.movie_id, 1, review.ratings)
+            leaderboards.refresh_movies([review.movie_id])
+            leaderboards.bump_trending({review.movie_id: 1})
+            review_stats.invalidate([review.movie_id])
+            # Queue the email in the same transaction as the review
+            send_email_for_review_added(review.email, review.movie.title, review.ratings)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Lock the row so concurrent edits cannot apply the same old values twice
+            old = Reviews.objects.select_for_update().values('movie_id', 'ratings').get(pk=serializer.instance.pk)
+            review = serializer.save()
+            Movies.apply_review_delta(old['movie_id'], -1, -old['ratings'])
+            Movies.apply_review_delta(review.movie_id, 1, review.ratings)
+            leaderboards.refresh_movies({old['movie_id'], review.movie_id})
+            review_stats.invalidate({old['movie_id'], review.movie_id})
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            old = Reviews.objects.select_for_update().values('movie_id', 'ratings').get(pk=instance.pk)
+            instance.delete()
+            Movies.apply_review_delta(old['movie_id'], -1, -old['ratings'])
+            leaderboards.refresh_movies([old['movie_id']])
+            review_stats.invalidate([old['movie_id']])
+            bump_versions(*RESPONSE_NAMESPACES[Reviews])
       
+class ReviewsBatchView(APIView):
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
+
+    def post(self, request, format=None):
+        items = request.data
+        max_size = getattr(settings, 'REVIEW_BATCH_MAX_SIZE', 1000)
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Expected a non-empty list of reviews.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > max_size:
+            return Response({'error': f'A batch may hold at most {max_size} reviews.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        movie_ids = set()
+        for item in items:
+            try:
+                movie_ids.add(int(item['movie']))
+            except (TypeError, KeyError, ValueError):
+                pass
+        context = {'movies': Movies.objects.in_bulk(movie_ids)}
+
+        reviews, errors = [], []
+        for index, item in enumerate(items):
+            serializer = ReviewBatchItemSerializer(data=item, context=context)
+            if serializer.is_valid():
+                reviews.append(Reviews(**serializer.validated_data))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        if not reviews:
+            return Response({'created': [], 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        deltas = {}
+        for review in reviews:
+            count, total = deltas.get(review.movie_id, (0, 0))
+            deltas[review.movie_id] = (count + 1, total + review.ratings)
+        with transaction.atomic():
+            Reviews.objects.bulk_create(reviews)
+            # One UPDATE per affected movie, not per review
+            for movie_id, (count, total) in deltas.items():
+                Movies.apply_review_delta(movie_id, count, total)
+            leaderboards.refresh_movies(deltas)
+            leaderboards.bump_trending({movie_id: count for movie_id, (count, total) in deltas.items()})
+            review_stats.invalidate(deltas)
+            send_emails_for_reviews_added(reviews)
+            bump_versions(*RESPONSE_NAMESPACES[Reviews])
+        return Response({'created': ReviewSerializer(reviews, many=True).data, 'errors': errors}, status=status.HTTP_201_CREATED)
+
+def query_limit(request, default=10, maximum=100):
+    try:
+        return min(max(int(request.query_params.get('limit', default)), 1), maximum)
+    except ValueError:
+        return None
+
+LIMIT_ERROR = {'limit': ['A valid integer is required.']}
+
+class LeaderboardView(CachedResponseMixin, APIView):
+    # Served from LeaderboardEntry, see base/leaderboards.py
+    cache_namespace = 'movies'
+    trending = False
+
+    def get(self, request, format=None):
+        return self.cached_response(self.board_response, request)
+
+    def board_response(self, request):
+        if self.trending:
+            board = leaderboards.TRENDING
+        elif 'genre' in request.query_params:
+            board = leaderboards.genre_board(request.query_params['genre'])
+        elif 'platform' in request.query_params:
+            board = leaderboards.platform_board(request.query_params['platform'])
+        else:
+            board = leaderboards.TOP
+        limit = query_limit(request)
+        if limit is None:
+            return Response(LIMIT_ERROR, status=status.HTTP_400_BAD_REQUEST)
+        entries = list(leaderboards.read_board(board, limit))
+        results = MovieSerializer([entry.movie for entry in entries], many=True).data
+        for rank, (entry, movie) in enumerate(zip(entries, results), start=1):
+            movie['rank'] = rank
+            movie['score'] = entry.score
+        return Response({'board': board, 'results': results}, status=status.HTTP_200_OK)
+
+class SimilarMoviesView(CachedResponseMixin, APIView):
+    # Served from SimilarMovie, see base/similarity.py
+    cache_namespace = 'movies'
+
+    def get(self, request, pk, format=None):
+        return self.cached_response(self.similar_response, request, pk)
+
+    def similar_response(self, request, pk):
+        limit = query_limit(request)
+        if limit is None:
+            return Response(LIMIT_ERROR, status=status.HTTP_400_BAD_REQUEST)
+        entries = list(read_similar(pk, limit))
+        # Only a movie with no neighbours needs the existence check
+        if not entries and not Movies.objects.filter(pk=pk).exists():
+            raise Http404
+        results = MovieSerializer([entry.similar for entry in entries], many=True).data
+        for entry, movie in zip(entries, results):
+            movie['score'] = entry.score
+        return Response({'movie': pk, 'results': results}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def movie_review_stats(request, pk):
+    stats = review_stats.get_stats([pk])[0]
+    # Only an unreviewed movie needs the existence check
+    if not stats['count'] and not Movies.objects.filter(pk=pk).exists():
+        raise Http404
+    return Response(stats, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def review_stats_batch(request):
+    try:
+        ids = list(dict.fromkeys(int(pk) for pk in request.query_params.get('ids', '').split(',') if pk.strip()))
+    except ValueError:
+        ids = None
+    max_size = getattr(settings, 'REVIEW_STATS_BATCH_MAX_SIZE', 100)
+    if not ids or len(ids) > max_size:
+        return Response({'error': f'Expected "ids": up to {max_size} comma-separated movie ids.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(review_stats.get_stats(ids), status=status.HTTP_200_OK)
+
 class ReviewsApiViewSetDetails(generics.ListAPIView):
     serializer_class = ReviewSerializer
+    renderer_classes = RENDERER_CLASSES
+    pagination_class = ReviewCursorPagination
 
     def get_queryset(self):
         movie_id = self.kwargs['pk']
-        return Reviews.objects.filter(movie_id=movie_id)
+        return Reviews.objects.filter(movie_id=movie_id).select_related('movie')
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 def register(request):
     serializer = UserSerializer(data=request.data)
     if serializer.is_valid():
@@ -61,48 +347,65 @@ def register(request):
         try:
             # Validate the password
             CustomPasswordValidator().validate(password)
-            # If valid, hash the password
-            hash_password = make_password(password)
-            
-            # Save the user instance
-            user = serializer.save()
-            user.password = hash_password
-            user.save()
-            send_otp_for_verification_email(serializer.data['email'])
+            # create_user hashes the password once and inserts the user once;
+            # the OTP goes to the OTP store and its mail is queued in the same
+            # transaction, to be delivered by the outbox worker
+            with transaction.atomic():
+                user = serializer.save()
+                send_otp_for_verification_email(user.email)
             return Response({'message': 'Registration Successful. Please Check your email for Email Validation OTP'}, status=status.HTTP_201_CREATED)
+        except IntegrityError:
+            # A concurrent registration took the phone number after the check above
+            if User.objects.filter(phone=phone).exists():
+                return Response({'phone': ['Phone number already exists.']}, status=status.HTTP_400_BAD_REQUEST)
+            raise
         except ValidationError as e:
             # If password validation fails, return the errors
             return Response({'password': e.messages}, status=status.HTTP_400_BAD_REQUEST)
     else:
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 class VerifyOTP(APIView):
+    throttle_classes = [VerifyOTPThrottle]
+
     def post(self, request):
         try:
             data = request.data
             serializer = VerifyAccountSerializer(data=data)
             
             if serializer.is_valid():
-                email = serializer.validated_data.get('email')
+                # As the OTP store and UserManager normalise it
+                email = normalize_email(serializer.validated_data.get('email'))
                 otp = serializer.validated_data.get('otp')
                 
-                user = User.objects.filter(email=email)
-                if not user.exists():
+                # One store lookup, then one UPDATE; the User row is never read
+                result = get_otp_store().verify(email, otp)
+                if result == LOCKED:
                     return Response({
                         'status': 400,
-                        'message': 'User not found',
-                        'data': 'Invalid email address provided.'
+                        'message': 'Too many attempts',
+                        'data': 'Too many incorrect OTPs. Please request a new one.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                
+                if result == EXPIRED:
+                    return Response({
+                        'status': 400,
+                        'message': 'OTP expired',
+                        'data': 'The OTP has expired or was never requested. Please request a new one.'
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
-                if user[0].otp != otp:
+                if result != VERIFIED:
                     return Response({
                         'status': 400,
                         'message': 'Invalid OTP',
                         'data': 'The OTP you entered is incorrect.'
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
-                user = user.first()
-                user.is_email_verified = True
-                user.save()
+                if not User.objects.filter(email=email).update(is_email_verified=True):
+                    return Response({
+                        'status': 400,
+                        'message': 'User not found',
+                        'data': 'Invalid email address provided.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
                 
                 return Response({
                     'status': 200,
@@ -130,8 +433,22 @@ class VerifyOTP(APIView):
                 'data': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class ResendOTP(APIView):
+    throttle_classes = [ResendOTPThrottle]
+
+    def post(self, request):
+        serializer = ResendOTPSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        email = normalize_email(serializer.validated_data['email'])
+        with transaction.atomic():
+            if User.objects.filter(email=email, is_email_verified=False).exists():
+                send_otp_for_verification_email(email)
+        # Same answer either way so the endpoint cannot be used to probe for accounts
+        return Response({'message': 'If the account exists and is not verified yet, a new OTP has been sent.'}, status=status.HTTP_200_OK)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def Login(request):
     serializer = LoginSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -163,10 +480,13 @@ def add_to_watchlist(request,pk):
         movie = Movies.objects.get(pk=pk)
     except Movies.DoesNotExist:
         return Response({'error':'Movie not found.'},status=status.HTTP_404_NOT_FOUND)
-    watchlist, created = Watchlist.objects.get_or_create(user=request.user, movie=movie)
+    with transaction.atomic():
+        watchlist, created = Watchlist.objects.get_or_create(user=request.user, movie=movie)
+        if created:
+            queue_movies([movie.pk])
+            send_mail_add_to_watchlist(request.user.email, movie.title)
     
     if created:
-        send_mail_add_to_watchlist(request.user.email, movie.title)
         return Response({'message':f'{movie.title} added to watchlist.'},status=status.HTTP_201_CREATED)
     else:
         return Response({'message':f'{movie.title} already in watchlist.'},status=status.HTTP_400_BAD_REQUEST)
@@ -175,10 +495,66 @@ def add_to_watchlist(request,pk):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def view_watchlist(request):
-    watchlist_items = Watchlist.objects.filter(user=request.user)
-    movies = [item.movie for item in watchlist_items]
-    serializer = MovieSerializer(movies, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    # Read the movies straight through the watchlist join: one query for the
+    # page (movie + platform) and one for its genres, whatever the page size
+    movies = sparse_movie_queryset(
+        Movies.objects.filter(watchlist__user=request.user)
+        .annotate(watchlist_added_on=F('watchlist__added_on'), watchlist_id=F('watchlist__id')),
+        movie_fields(request),
+    )
+    paginator = WatchlistCursorPagination()
+    page = paginator.paginate_queryset(movies, request)
+    serializer = MovieSerializer(page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
+
+def watchlist_movie_ids(request):
+    ids = request.data.get('movies') if isinstance(request.data, dict) else None
+    max_size = getattr(settings, 'WATCHLIST_BATCH_MAX_SIZE', 500)
+    if not isinstance(ids, list) or not ids or len(ids) > max_size:
+        return None
+    try:
+        return list(dict.fromkeys(int(pk) for pk in ids))
+    except (TypeError, ValueError):
+        return None
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_add_to_watchlist(request):
+    ids = watchlist_movie_ids(request)
+    if ids is None:
+        return Response({'error':'Expected "movies": a list of movie ids.'},status=status.HTTP_400_BAD_REQUEST)
+    titles = dict(Movies.objects.filter(pk__in=ids).values_list('id', 'title'))
+    with transaction.atomic():
+        existing = set(Watchlist.objects.filter(user=request.user, movie_id__in=titles).values_list('movie_id', flat=True))
+        # The unique (user, movie) constraint absorbs any concurrent duplicate
+        Watchlist.objects.bulk_create([Watchlist(user=request.user, movie_id=pk) for pk in titles if pk not in existing], ignore_conflicts=True)
+        added = [titles[pk] for pk in titles if pk not in existing]
+        if added:
+            queue_movies([pk for pk in titles if pk not in existing])
+            send_mail_watchlist_digest(request.user.email, added=added)
+    return Response({
+        'added': added,
+        'already_in_watchlist': [titles[pk] for pk in titles if pk in existing],
+        'not_found': [pk for pk in ids if pk not in titles],
+    }, status=status.HTTP_201_CREATED if added else status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_delete_watchlist(request):
+    ids = watchlist_movie_ids(request)
+    if ids is None:
+        return Response({'error':'Expected "movies": a list of movie ids.'},status=status.HTTP_400_BAD_REQUEST)
+    items = Watchlist.objects.filter(user=request.user, movie_id__in=ids)
+    with transaction.atomic():
+        titles = dict(items.values_list('movie_id', 'movie__title'))
+        items.delete()
+        if titles:
+            queue_movies(titles)
+            send_mail_watchlist_digest(request.user.email, removed=list(titles.values()))
+    return Response({
+        'removed': list(titles.values()),
+        'not_in_watchlist': [pk for pk in ids if pk not in titles],
+    }, status=status.HTTP_200_OK)
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
@@ -187,6 +563,8 @@ def delete_watchlist(request,pk):
         watchlist_item = Watchlist.objects.get(user=request.user, movie_id=pk)
     except Watchlist.DoesNotExist:
         return Response({'error':'Movie not found in watchlist.'},status=status.HTTP_404_NOT_FOUND)
-    watchlist_item.delete()
-    send_mail_delete_watchlist(request.user.email, watchlist_item.movie.title)
+    with transaction.atomic():
+        watchlist_item.delete()
+        queue_movies([watchlist_item.movie_id])
+        send_mail_delete_watchlist(request.user.email, watchlist_item.movie.title)
     return Response({'message':f'{watchlist_item.movie.title} deleted from watchlist.'},status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file